@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pyfiles.build_frames as build_frames
+import pyfiles.costs as costs
+import pyfiles.run_cache as run_cache
+
+# kind -> single-file reader
+LOADERS = {
+    'hourly':  build_frames.timeseries_hourly,
+    'monthly': build_frames.timeseries_months,
+    'annual':  build_frames.timeseries_yearly,
+    'costs':   costs.get_costs,
+}
+
+
+class RunLoadError(RuntimeError):
+    """Raised by load_runs when one or more files failed; `failures` maps path -> exception."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f"  {path}: {type(e).__name__}: {e}" for path, e in failures.items()]
+        super().__init__(f"{len(failures)} run(s) failed to load:\n" + "\n".join(lines))
+
+
+def _load_one(path, kind):
+    return LOADERS[kind](path)
+
+
+def _map(func, paths, args, workers, errors):
+    """{path: func(path, *args)} over the unique paths, in a process pool; failures handled per `errors`."""
+    if errors not in ("raise", "skip"):
+        raise ValueError(f"Unknown errors mode: {errors!r}")
+
+    unique = list(dict.fromkeys(paths))   # same file twice -> parsed once
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(unique)))
+
+    results, failures = {}, {}
+
+    if workers == 1:
+        for path in unique:
+            try:
+                results[path] = func(path, *args)
+            except Exception as e:
+                failures[path] = e
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {path: pool.submit(func, path, *args) for path in unique}
+            for path, fut in futures.items():
+                try:
+                    results[path] = fut.result()
+                except Exception as e:
+                    failures[path] = e
+
+    if failures:
+        if errors == "raise":
+            raise RunLoadError(failures)
+        for path, e in failures.items():
+            print(f"Warning: could not load {path} ({type(e).__name__}: {e})")
+
+    return results
+
+
+def load_runs(paths, kind="hourly", workers=None, errors="raise"):
+    """
+    Load many EnergyPLAN workbooks in parallel.
+
+    paths   : file names relative to 0_EP_runs (as in var_groups)
+    kind    : 'hourly', 'monthly', 'annual' or 'costs'
+    workers : number of processes (default: all cores; 1 = no pool)
+    errors  : 'raise' -> RunLoadError listing every failed file
+              'skip'  -> None in place of a failed file (with a warning)
+
+    Returns a list of DataFrames in the order of `paths`.
+    """
+    if kind not in LOADERS:
+        raise ValueError(f"Unknown kind: {kind!r} (expected one of {list(LOADERS)})")
+
+    paths = list(paths)
+    results = _map(_load_one, paths, (kind,), workers, errors)
+
+    # copies so that duplicated paths do not share one frame
+    return [results[p].copy() if p in results else None for p in paths]
+
+
+def warm_runs(paths, kinds=run_cache.KINDS, workers=None, errors="raise"):
+    """
+    Build the run_cache entries of many workbooks in parallel
+    (run_cache.warm) without sending any frame back from the workers.
+
+    Arguments as load_runs. Returns the list of paths that failed.
+    """
+    unknown = set(kinds) - set(run_cache.KINDS)
+    if unknown:
+        raise ValueError(f"Unknown kind(s): {sorted(unknown)} (expected some of {run_cache.KINDS})")
+
+    paths = list(paths)
+    results = _map(run_cache.warm, paths, (tuple(kinds),), workers, errors)
+    return [p for p in dict.fromkeys(paths) if p not in results]
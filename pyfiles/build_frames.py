@@ -5,103 +5,105 @@ import itertools
 import builtins
 import numpy as np
 
-# aggregator helper
-def aggregate_heat_units(df):
-    """
-    Aggregate unit-specific heat columns into tech-level aggregates
-    and drop the original unit columns.
-
-    Returns a *copy* of df with new columns:
-    - Solar_tot_Heat
-    - CSHP_tot_Heat
-    - CHP_tot_Heat
-    - HP_tot_Heat
-    """
-    agg_map = {
-        'Solar_tot_Heat': ['Solar_Heat', 'Solar2_Heat'],
-        'CSHP_tot_Heat':  ['CSHP 2_Heat', 'CSHP 3_Heat'],
-        'CHP_tot_Heat':   ['CHP 2_Heat', 'CHP 3_Heat'],
-        'HP_tot_Heat':    ['HP 2_Heat', 'HP 3_Heat'],
-        'Storage_Heat':   ['Storage2_Heat','Storage3_Heat']
-    }
-
-    df = df.copy()
-
-    # create aggregates
-    for new_col, old_cols in agg_map.items():
-        existing = [c for c in old_cols if c in df.columns]
-        if existing:
-            df[new_col] = df[existing].sum(axis=1)
-
-    # drop originals
-    cols_to_drop = {c for cols_ in agg_map.values() for c in cols_ if c in df.columns}
-    if cols_to_drop:
-        df = df.drop(columns=list(cols_to_drop))
-
-    return df
+from pyfiles.ep_run import (
+    aggregate_heat_units, compact_hourly, memory_mb, open_run, read_annual_stream,
+    read_hourly_stream, read_hourly_text, text_sibling,
+)
+import pyfiles.profiling as profiling
+import pyfiles.run_cache as run_cache
 
 # -------------------------------------------------------------------------------
 # 1. Core loader: ONE file -> cleaned hourly dataframe
 # -------------------------------------------------------------------------------
 
-def timeseries_hourly(excel_path, sheet_name=0):
+@profiling.profiled
+def timeseries_hourly(excel_path, sheet_name=0, use_cache=True, columns=None, compact=False):
     """
     Read EnergyPLAN-style Excel output and return hourly df.
-    """
-    df_ = pd.read_excel('0_EP_runs/' + excel_path, sheet_name=sheet_name)
-
-    # 1. eliminate initial rows
-    df = df_[df_.index >= 79].copy()
-
-    # 2. merge top two header rows
-    df.columns = [
-        f"{str(col1).strip()}_{str(col2).strip()}" if col2 else str(col1).strip()
-        for col1, col2 in zip(df.iloc[0], df.iloc[1])
-    ]
-    df = df.iloc[2:].reset_index(drop=True)
 
-    # 3. select data (same rule as before: index >= 23)
-    hourly = df[df.index >= 23].copy()
+    With use_cache=True the cleaned frame is served from 0_EP_runs/.cache
+    when the workbook is unchanged. Passing `columns` (e.g. var_groups.electr)
+    streams only those columns from the workbook instead.
 
-    # 4. ensure numeric
-    hourly = hourly.apply(pd.to_numeric, errors='coerce')
+    If EnergyPLAN's text export (<stem>.ascii.txt, see ep_run.text_sibling)
+    sits next to the .xlsx, it is read instead of the workbook.
 
-    # 5a. enforce that the *first* column is called 'hour'
-    first_col = hourly.columns[0]
-    hourly = hourly.rename(columns={first_col: "hour"})
-
-    # 5b. if there were any duplicate 'hour' columns, keep the first
-    hourly = hourly.loc[:, ~hourly.columns.duplicated()]
+    compact=True returns float32 values, categorical source, int16 hour
+    (see ep_run.compact_hourly).
+    """
+    if columns is not None:
+        text_path = text_sibling(excel_path)
+        if text_path is not None:
+            df = read_hourly_text(text_path, source=Path(excel_path).stem, columns=columns)
+        else:
+            df = read_hourly_stream(excel_path, sheet_name=sheet_name, columns=columns)
+    elif use_cache:
+        df = run_cache.load_block(excel_path, 'hourly', sheet_name=sheet_name)
+    else:
+        df = open_run(excel_path, sheet_name=sheet_name).hourly.copy()
+    return compact_hourly(df) if compact else df
 
-    # 5c. add tag and summer dummy
-    hourly["source"] = Path(excel_path).stem   # use the actual file, not hardcoded
-    hourly["d_summer"] = (hourly["hour"] >= 3649) & (hourly["hour"] < 5857)
 
-    # 6. arrange columns: hour, source, d_summer, rest...
-    cols = hourly.columns.tolist()
-    cols.remove("source")
-    cols.remove("d_summer")
-    cols.insert(1, "source")
-    cols.insert(2, "d_summer")
-    hourly = hourly[cols]
+@profiling.profiled
+def concat_hourly(dfs, compact=True, report=False):
+    """
+    pd.concat of hourly frames (all_h) that stays compact: 'source' is
+    kept categorical across frames instead of falling back to object.
 
-    # 7. aggregate heat units
-    hourly = aggregate_heat_units(hourly)
+    Group the result with observed=True (e.g. groupby('source', observed=True)).
+    report=True prints the memory of the plain concat vs. the compact one.
+    """
+    dfs = list(dfs)
+    if report:
+        before = sum(memory_mb(d) for d in dfs)
+    if compact:
+        dfs = [compact_hourly(d) for d in dfs]
+        sources = list(dict.fromkeys(s for d in dfs for s in d["source"].cat.categories))
+        dfs = [d.assign(source=d["source"].cat.set_categories(sources)) for d in dfs]
 
-    return hourly
+    out = pd.concat(dfs, ignore_index=True)
+    if report:
+        print(f"{len(dfs)} hourly frames: {before:.1f} MB -> {memory_mb(out):.1f} MB")
+    return out
 
 
 # -------------------------------------------------------------------------------
 # 2. Multi-case plotting: MANY files -> one plot per variable, one line per case
 # -------------------------------------------------------------------------------
 
+@profiling.profiled(sizes=False)
 def plot_metrics(
     dfs,
     plots=None,
     case_labels=None,
     tech_labels=None,
     colors=None,
+    savepath=None,          # e.g. "0_figs/hourly_{col}.png" ({col} -> variable name)
+    dpi=300,
+    save_kwargs=None,
+    show=False,
+    close=False,            # close each figure after saving/showing
+    decimate=None,          # e.g. 1000 -> min/max of 1000 hour buckets per line
+    rolling=None,           # e.g. 168 -> rolling-mean line over a faint raw line
+    rasterize=False,        # lines as an image inside vector (pdf) output
 ):
+    """
+    One figure per variable in `plots`, one line per case (dataframe).
+
+    Many cases / long series:
+    - decimate=n  draws the min and max of n equal hour buckets
+                  (2n points instead of 8784, peaks stay visible)
+    - rolling=w   adds a centred w-hour rolling mean per case and draws
+                  the raw series faintly behind it
+    - rasterize   keeps axes and text vector but the lines as pixels,
+                  so PDFs stay small
+
+    Saving:
+    - savepath with '{col}' -> one file per variable
+    - savepath without it   -> '<stem>_<variable><suffix>'
+
+    Returns a list of (fig, ax); empty if close=True.
+    """
 
     if dfs is None or len(dfs) == 0:
         raise ValueError("`dfs` must be a non-empty list of DataFrames.")
@@ -146,6 +148,7 @@ def plot_metrics(
     # 4. plotting
     # ------------------------------------------------------------------
     linestyles = ['-', ':', ':', ':']  # cycle if more cases
+    figs = []
 
     for col in plots_valid:
         fig, ax = plt.subplots(figsize=(12, 5))
@@ -166,21 +169,25 @@ def plot_metrics(
 
             c = next(color_iter)
 
-            if c is None:
-                ax.plot(
-                    d["hour"], d[col],
-                    linewidth=1.2,
-                    linestyle=ls,
-                    label=label,
-                )
+            x = d["hour"].to_numpy()
+            y = d[col].to_numpy(dtype=float)
+            line_kw = dict(linewidth=1.2, linestyle=ls, rasterized=rasterize)
+            if c is not None:
+                line_kw["color"] = c
+
+            x_raw, y_raw = minmax_decimate(x, y, decimate) if decimate else (x, y)
+
+            if rolling is None:
+                ax.plot(x_raw, y_raw, label=label, **line_kw)
             else:
-                ax.plot(
-                    d["hour"], d[col],
-                    linewidth=1.2,
-                    linestyle=ls,
-                    label=label,
-                    color=c,
-                )
+                # faint raw series, then the rolling mean in the same color
+                raw, = ax.plot(x_raw, y_raw, **{**line_kw, "linewidth": 0.6, "alpha": 0.3})
+                y_roll = pd.Series(y).rolling(rolling, center=True, min_periods=1).mean().to_numpy()
+                if decimate:
+                    x_roll, y_roll = minmax_decimate(x, y_roll, decimate)
+                else:
+                    x_roll = x
+                ax.plot(x_roll, y_roll, label=label, **{**line_kw, "color": raw.get_color()})
 
         ax.set_xlabel("Hour")
         ax.set_ylabel("MW")
@@ -194,52 +201,81 @@ def plot_metrics(
         ax.set_title(pretty_name)
         ax.grid(True, which="both", linestyle="--", alpha=0.4)
         ax.legend()
-        plt.tight_layout()
+        fig.tight_layout()
+
+        # save (optional)
+        if savepath is not None:
+            outpath = _metric_path(savepath, col)
+            outpath.parent.mkdir(parents=True, exist_ok=True)
+
+            skw = dict(bbox_inches="tight")
+            if outpath.suffix.lower() in [".png", ".jpg", ".jpeg", ".tif", ".tiff", ".webp"]:
+                skw["dpi"] = dpi
+            if save_kwargs:
+                skw.update(save_kwargs)
+
+            with profiling.stage('savefig') as rec:
+                fig.savefig(outpath, **skw)
+                rec['bytes'] = outpath.stat().st_size
+
+        if show:
+            plt.show()
+        if close:
+            plt.close(fig)
+        else:
+            figs.append((fig, ax))
+
+    return figs
+
+
+@profiling.profiled
+def minmax_decimate(x, y, n_buckets):
+    """
+    Downsample a line to the min and max point of n_buckets equal
+    buckets (in x order), so peaks and troughs survive. NaN gaps stay
+    gaps. Series with at most 2 * n_buckets points are returned as is.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return x, y
+
+    k = -(-n // n_buckets)                               # points per bucket
+    pad = np.full(n_buckets * k, np.nan)
+    pad[:n] = y
+    blocks = pad.reshape(n_buckets, k)
+
+    nan = np.isnan(blocks)
+    imin = np.where(nan, np.inf, blocks).argmin(axis=1)
+    imax = np.where(nan, -np.inf, blocks).argmax(axis=1)
+
+    base = np.arange(n_buckets) * k
+    idx = np.unique(np.concatenate([base + imin, base + imax]))
+    idx = idx[idx < n]
+    return x[idx], y[idx]
+
+
+def _metric_path(savepath, col):
+    """Output file of one variable: fill '{col}' or append '_<col>' to the stem."""
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in col).strip("_")
+    savepath = str(savepath)
+    if "{col}" in savepath:
+        return Path(savepath.format(col=safe))
+    p = Path(savepath)
+    return p.with_name(f"{p.stem}_{safe}{p.suffix or '.png'}")
 
 # -------------------------------------------------------------------------------
 # 3. Same but for months
 # -------------------------------------------------------------------------------
 
-def timeseries_months(excel_path, sheet_name=0):
+@profiling.profiled
+def timeseries_months(excel_path, sheet_name=0, use_cache=True):
     """
     Replica of 'timeseries' but for months.
     """
-    df_ = pd.read_excel('0_EP_runs/' + excel_path, sheet_name=sheet_name)
-
-    df = df_[df_.index >= 79].copy()
-
-    df.columns = [
-        f"{str(col1).strip()}_{str(col2).strip()}" if col2 else str(col1).strip()
-        for col1, col2 in zip(df.iloc[0], df.iloc[1])
-    ]
-    df = df.iloc[2:].reset_index(drop=True)
-
-    # 3. select data (months: index 5–16)
-    monthly = df[(df.index >= 5) & (df.index <= 16)].copy()
-
-    # 4. rename first column to 'month' BEFORE numeric conversion
-    first_col = monthly.columns[0]
-    monthly = monthly.rename(columns={first_col: "month"})
-    monthly = monthly.loc[:, ~monthly.columns.duplicated()]
-    monthly["source"] = Path(excel_path).stem
-
-    # put 'source' as second column
-    cols = monthly.columns.tolist()
-    cols.remove("source")
-    cols.insert(1, "source")
-    monthly = monthly[cols]
-
-    # 5. ensure numeric for data columns only (not month/source)
-    data_cols = [c for c in monthly.columns if c not in ["month", "source"]]
-    monthly[data_cols] = monthly[data_cols].apply(
-        pd.to_numeric,
-        errors="coerce"
-    )
-
-    # aggregate heat units
-    monthly = aggregate_heat_units(monthly)
-
-    return monthly
+    if use_cache:
+        return run_cache.load_block(excel_path, 'monthly', sheet_name=sheet_name)
+    return open_run(excel_path, sheet_name=sheet_name).monthly.copy()
 
 # def plot_metrics_months(
 #     dfs,
@@ -348,52 +384,19 @@ def timeseries_months(excel_path, sheet_name=0):
 # 4. yearly columns
 # -------------------------------------------------------------------
 
-# def timeseries_yearly(excel_path, sheet_name=0):
-#     """
-#     Read EnergyPLAN-style Excel output and return a 1-row df
-#     with annual totals for all variables, plus a 'source' column.
-#     """
-
-#     df_ = pd.read_excel(
-#         '0_EP_runs/' + excel_path,
-#         sheet_name=sheet_name,
-#         decimal=','
-#     )
-
-#     # 1. drop initial junk rows
-#     df = df_[df_.index >= 79].copy()
-
-#     # 2. merge top two header rows
-#     df.columns = [
-#         f"{str(col1).strip()}_{str(col2).strip()}" if col2 else str(col1).strip()
-#         for col1, col2 in zip(df.iloc[0], df.iloc[1])
-#     ]
-#     df = df.iloc[2:].reset_index(drop=True)
-
-#     # 3. pick the annual row (index == 2)
-#     annual = df[df.index == 2].copy()
-
-#     # 4. rename first column and drop it
-#     first_col = annual.columns[0]
-#     annual = annual.rename(columns={first_col: "Annual (TWh/year)"})
-#     annual = annual.drop(columns=["Annual (TWh/year)"])
-
-#     # 5. ensure numeric
-#     annual = annual.apply(pd.to_numeric, errors='coerce')
-
-#     # 6. add source
-#     annual["source"] = Path(excel_path).stem
+@profiling.profiled
+def timeseries_yearly(excel_path, sheet_name=0):
+    """
+    Read EnergyPLAN-style Excel output and return a 1-row df
+    with annual totals for all variables, plus a 'source' column.
 
-#     # 7. put source first
-#     cols = annual.columns.tolist()
-#     cols.remove("source")
-#     cols.insert(0, "source")
-#     annual = annual[cols]
+    Only the header rows and the annual row are streamed from the
+    workbook; the hourly block is never read.
 
-#     # 8. aggregate heat units
-#     annual = aggregate_heat_units(annual)
+    For many runs: pd.concat(batch_load.load_runs(paths, kind='annual')).
+    """
+    return read_annual_stream(excel_path, sheet_name=sheet_name)
 
-#     return annual
 
 # def plot_metrics_yearly(
 #     dfs,
@@ -1,10 +1,15 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-import requests
 import numpy as np
 from pathlib import Path
 from typing import Sequence, Optional
 
+import pyfiles.eds_client as eds_client
+import pyfiles.chunk_store as chunk_store
+import pyfiles.profiles as profiles
+import pyfiles.profiling as profiling
+import pyfiles.distributions as distributions
+
 def time_inputs(start: str, end: str):
     s = pd.to_datetime(start)
     e = pd.to_datetime(end)
@@ -16,8 +21,30 @@ def time_inputs(start: str, end: str):
     year_label = str(years[0]) if single_year else f"{years[0]}-{years[-1]}"
 
     return years, single_year, year_label
-    
 
+
+@profiling.profiled
+def _fetch_pcs(value_columns, start, end, timezone="UTC"):
+    """
+    ProductionConsumptionSettlement rows (HourUTC, PriceArea, value_columns).
+    UTC requests are served from the per-year chunk store.
+    """
+    if timezone == "UTC":
+        return chunk_store.get_store().get(
+            "ProductionConsumptionSettlement", value_columns, start, end
+        )
+    return eds_client.get_client().get_frame(
+        "ProductionConsumptionSettlement",
+        start=start,
+        end=end,
+        timezone=timezone,
+        columns="HourUTC,PriceArea," + ",".join(value_columns),
+        sort="HourUTC asc",
+        limit=0,
+    )
+
+
+@profiling.profiled
 def build_variation_pattern(
     value_columns: Sequence[str], 
     weights = False,
@@ -26,65 +53,166 @@ def build_variation_pattern(
     start = str,
     end = str,
     single_year = str,
-    year_label = str
+    year_label = str,
+    stat = "mean",
+    out_dir = None,
 ):
+    """
+    8784-hour EnergyPLAN distribution of the summed `value_columns`
+    (DK total). Multi-year spans are reduced to a typical year with
+    `stat` ('mean', 'median' or a quantile, see profiles.typical_year).
 
-    base = "https://api.energidataservice.dk/dataset/ProductionConsumptionSettlement"
+    save=True writes <out_dir>/<year_label>_<name>.txt
+    (out_dir defaults to distributions.DIST_DIR).
+    """
 
-    params = {
-        "start": start,
-        "end": end,
-        "timezone": "UTC",
-        "columns": "HourUTC,PriceArea," + ",".join(value_columns),
-        "sort": "HourUTC asc",
-        "limit": 0,
-    }
+    df = _drop_leap_day(_fetch_pcs(value_columns, start, end))
+    df_dk_8784, s_DK1, s_DK2 = _pattern(df, value_columns, single_year, stat=stat)
 
-    r = requests.get(base, params=params, timeout=60)
-    r.raise_for_status()
-    df = pd.DataFrame(r.json().get("records", []))
+    # save
+    if save:
+        path = distributions.distribution_path(name, year_label, out_dir)
+        distributions.write_distribution(df_dk_8784, path)
 
+    if weights:
+        return df_dk_8784, s_DK1, s_DK2
+    else:
+        return df_dk_8784
+
+
+def _drop_leap_day(df):
     df["HourUTC"] = pd.to_datetime(df["HourUTC"])
-    df = df.loc[~((df["HourUTC"].dt.month == 2) & (df["HourUTC"].dt.day == 29))].copy()
+    return df.loc[~((df["HourUTC"].dt.month == 2) & (df["HourUTC"].dt.day == 29))].copy()
 
+
+def _pattern(df, value_columns, single_year, stat="mean"):
+    """
+    8784-hour DK-total profile of the summed value_columns plus DK1/DK2
+    shares, from already fetched (leap-day free) PCS rows.
+    """
     # combine selected value columns into one value series
-    for c in value_columns:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    df["value"] = df[list(value_columns)].sum(axis=1, min_count=1)  # ignores all-NaN rows
+    value = df[list(value_columns)].apply(pd.to_numeric, errors="coerce").sum(axis=1, min_count=1)  # ignores all-NaN rows
 
     # DK total by hour
-    df_dk = df.groupby("HourUTC")["value"].sum()
+    df_dk = value.groupby(df["HourUTC"]).sum()
 
-    # multi-year typical-hour profile
+    # multi-year typical-hour profile (8784 slots incl. extra day)
     if not single_year:
-        template = pd.date_range("2021-01-01 00:00", periods=8760, freq="h")
-        key = template.strftime("%m-%d %H")
-        df_dk = (
-            df_dk.groupby(df_dk.index.strftime("%m-%d %H")).mean()
-            .reindex(key)
-            .reset_index(drop=True)
-        )
+        vals = profiles.typical_year(df_dk.to_numpy(), df_dk.index, stat=stat)
     else:
-        df_dk = df_dk.reset_index(drop=True)
+        vals = df_dk.to_numpy()
+        vals = np.concatenate([vals, vals[:24]])   # add extra day
+    df_dk_8784 = pd.Series(vals, name="value")
+
+    # shares (weighted by combined value)
+    total = value.sum()
+    s_DK1 = value[df["PriceArea"] == "DK1"].sum() / total if total else 0.0
+    s_DK2 = 1 - s_DK1
 
-    # add extra day
-    df_dk_8784 = pd.concat([df_dk, df_dk.iloc[:24]], ignore_index=True)
+    return df_dk_8784, s_DK1, s_DK2
 
-    # save
+
+# EnergyPLAN distributions built from ProductionConsumptionSettlement
+DISTRIBUTIONS = {
+    'Electricity_Demand': ["GrossConsumptionMWh"],
+    'solar_prod':         ["SolarPowerLt10kW_MWh", "SolarPowerGe10Lt40kW_MWh", "SolarPowerGe40kW_MWh"],
+    'offshore_prod':      ["OffshoreWindLt100MW_MWh", "OffshoreWindGe100MW_MWh"],
+    'onshore_prod':       ["OnshoreWindLt50kW_MWh", "OnshoreWindGe50kW_MWh"],
+}
+
+
+@profiling.profiled
+def build_variation_patterns(
+    groups=None,
+    start=str,
+    end=str,
+    save=False,
+    stat="mean",
+    out_dir=None,
+):
+    """
+    Batch version of build_variation_pattern: fetch the union of all
+    columns once and build every distribution from that one frame.
+
+    groups  : {distribution name: value columns} (default: DISTRIBUTIONS)
+    out_dir : folder for save=True (default: distributions.DIST_DIR)
+
+    Returns
+    - profiles : DataFrame, 8784 rows x one column per distribution
+    - shares   : DataFrame, index distribution, columns DK1 / DK2
+    """
+    groups = DISTRIBUTIONS if groups is None else groups
+    years, single_year, year_label = time_inputs(start, end)
+
+    union = list(dict.fromkeys(c for cols in groups.values() for c in cols))
+    df = _drop_leap_day(_fetch_pcs(union, start, end))
+
+    out, shares = {}, {}
+    for name, cols in groups.items():
+        out[name], s_DK1, s_DK2 = _pattern(df, cols, single_year, stat=stat)
+        shares[name] = {"DK1": s_DK1, "DK2": s_DK2}
+
+    profiles_df = pd.DataFrame({name: s.to_numpy() for name, s in out.items()})
+    shares_df = pd.DataFrame.from_dict(shares, orient="index")
+
+    # save all distribution files in one pass (unchanged files are not rewritten)
     if save:
-        out = fr'..\ZipEnergyPLAN163\energyPlan Data\Distributions\{year_label}_{name}.txt'
-        df_dk_8784.to_csv(out, sep="\t", index=False, header=False)
+        for name in groups:
+            path = distributions.distribution_path(name, year_label, out_dir)
+            distributions.write_distribution(profiles_df[name], path)
 
-    # shares (weighted by combined value)
-    if weights:
-        total = df["value"].sum()
-        s_DK1 = df.loc[df["PriceArea"] == "DK1", "value"].sum() / total if total else 0.0
-        s_DK2 = 1 - s_DK1
-        return df_dk_8784, s_DK1, s_DK2
+    return profiles_df, shares_df
+
+# spot price distribution, averaged over DK1/DK2 with the demand shares
+PRICE_DISTRIBUTION = 'ENS_elspotprices'
+
+
+@profiling.profiled
+def build_price_pattern(
+    start=str,
+    end=str,
+    shares=None,
+    save=False,
+    out_dir=None,
+):
+    """
+    8784-hour EnergyPLAN distribution of the Elspotprices SpotPriceEUR:
+    per hour the DK1/DK2 prices weighted by `shares` ({'DK1': s, 'DK2':
+    1 - s}, e.g. shares.loc['Electricity_Demand'] from
+    build_variation_patterns). Multi-year spans are averaged per hour of
+    the year (profiles.typical_year), Feb 29 dropped, first day appended.
+
+    save=True writes <out_dir>/<year_label>_ENS_elspotprices.txt
+    (out_dir defaults to distributions.DIST_DIR).
+    """
+    years, single_year, year_label = time_inputs(start, end)
+    shares = {"DK1": 0.5, "DK2": 0.5} if shares is None else dict(shares)
+
+    df = _drop_leap_day(chunk_store.get_store().get(
+        "Elspotprices", ["SpotPriceEUR"], start, end, filter={"PriceArea": ["DK1", "DK2"]}
+    ))
+
+    # share-weighted average per hour
+    w = df["PriceArea"].map(shares).astype(float)
+    g = df.assign(pxw=df["SpotPriceEUR"] * w, w=w).groupby("HourUTC", sort=True)
+    df_avg = g["pxw"].sum() / g["w"].sum()
+
+    if not single_year:
+        vals = profiles.typical_year(df_avg.to_numpy(), df_avg.index)
     else:
-        return df_dk_8784
+        vals = df_avg.to_numpy()
+        vals = np.concatenate([vals, vals[:24]])   # add extra day
+    price_8784 = pd.Series(vals, name="SpotPriceEUR")
+
+    if save:
+        path = distributions.distribution_path(PRICE_DISTRIBUTION, year_label, out_dir)
+        distributions.write_distribution(price_8784, path)
+
+    return price_8784
+
 
 # same but does not aggregate to one year
+@profiling.profiled
 def fetch_pcs_timeseries(
     value_columns: Sequence[str],
     start: str,
@@ -104,19 +232,7 @@ def fetch_pcs_timeseries(
     - No extra day appended
     """
 
-    base = "https://api.energidataservice.dk/dataset/ProductionConsumptionSettlement"
-    params = {
-        "start": start,
-        "end": end,
-        "timezone": timezone,
-        "columns": "HourUTC,PriceArea," + ",".join(value_columns),
-        "sort": "HourUTC asc",
-        "limit": 0,
-    }
-
-    r = requests.get(base, params=params, timeout=60)
-    r.raise_for_status()
-    df = pd.DataFrame(r.json().get("records", []))
+    df = _fetch_pcs(value_columns, start, end, timezone=timezone)
     if df.empty:
         out = pd.DataFrame({"HourUTC": pd.to_datetime([]), "value": pd.Series(dtype="float64")})
         if save_path:
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+import pyfiles.var_groups as var_groups
+from pyfiles.panel import ScenarioPanel
+
+# hours per month in the 8784-hour (leap) EnergyPLAN year
+MONTH_HOURS = np.array([31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]) * 24
+
+
+def register_capacities(stem, caps, registry=None):
+    """Add / replace the capacity dict of one scenario stem."""
+    registry = var_groups.caps_by_source if registry is None else registry
+    registry[stem] = dict(caps)
+
+
+def capacity_matrix(scenarios, variables, registry=None):
+    """
+    (scenario x variable) capacities from the registry.
+
+    Unknown scenarios or variables are NaN, so their capacity factors
+    come out as NaN instead of raising.
+    """
+    registry = var_groups.caps_by_source if registry is None else registry
+    caps = pd.DataFrame.from_dict(
+        {s: registry.get(s, {}) for s in scenarios}, orient='index'
+    )
+    return caps.reindex(index=list(scenarios), columns=list(variables)).astype(float)
+
+
+def month_of_hour(hour):
+    """Month (1-12) of EnergyPLAN hour numbers 1..8784."""
+    return np.searchsorted(np.cumsum(MONTH_HOURS), np.asarray(hour) - 1, side='right') + 1
+
+
+def _group_sum(values, groups, n_groups):
+    """
+    Sum (scenario, hour, variable) over hour groups -> (scenario, group, variable).
+    Groups without any value stay NaN (as pandas sum(min_count=1)).
+    """
+    onehot = np.zeros((len(groups), n_groups))
+    onehot[np.arange(len(groups)), groups] = 1.0
+    sums = np.einsum('shv,hg->sgv', np.nan_to_num(values), onehot)
+    counts = np.einsum('shv,hg->sgv', (~np.isnan(values)).astype(float), onehot)
+    sums[counts == 0] = np.nan
+    return sums, onehot.sum(axis=0)
+
+
+def capacity_factors(panel, variables=None, freq='annual', registry=None, scale=1.0):
+    """
+    Capacity factors for every scenario of a ScenarioPanel in one
+    broadcast division.
+
+    variables : technologies (default: var_groups.VE_electr)
+    freq      : 'hourly'   -> ScenarioPanel of hourly CFs
+                'monthly'  -> DataFrame indexed by (source, month)
+                'seasonal' -> DataFrame indexed by (source, d_summer)
+                'annual'   -> DataFrame indexed by source
+    scale     : unit factor between output and capacity
+                (e.g. 1000 for storages given in GW)
+    """
+    variables = list(var_groups.VE_electr if variables is None else variables)
+    panel = panel.select(variables)
+    caps = capacity_matrix(list(panel.scenarios), variables, registry).to_numpy() * scale
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if freq == 'hourly':
+            return ScenarioPanel(panel.values / caps[:, None, :], list(panel.scenarios),
+                                 variables, panel.hour)
+
+        if freq == 'annual':
+            # all-NaN runs stay missing instead of a 0 % capacity factor (min_count=1)
+            sums = np.nansum(panel.values, axis=1)
+            sums[np.isnan(panel.values).all(axis=1)] = np.nan
+            return pd.DataFrame(sums / (caps * len(panel.hour)), index=panel.index, columns=variables)
+
+        if freq == 'seasonal':
+            groups, labels, index = panel.d_summer.astype(int), [False, True], panel.season_index
+        elif freq == 'monthly':
+            groups = month_of_hour(panel.hour) - 1
+            labels = list(range(1, 13))
+            index = pd.MultiIndex.from_product([panel.index, labels], names=['source', 'month'])
+        else:
+            raise ValueError(f"Unknown freq: {freq!r}")
+
+        sums, hours = _group_sum(panel.values, groups, len(labels))
+        cf = sums / (caps[:, None, :] * hours[None, :, None])
+        return pd.DataFrame(cf.reshape(-1, len(variables)), index=index, columns=variables)
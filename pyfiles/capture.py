@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+import pyfiles.var_groups as var_groups
+from pyfiles.panel import ScenarioPanel
+
+PRICE_COL = 'InMarket_Prices'
+
+
+def _as_panel(data, techs, price):
+    """Accept a ScenarioPanel, a long frame (all_h) or a list of hourly frames."""
+    if isinstance(data, ScenarioPanel):
+        return data.select(list(techs) + [price])
+    if isinstance(data, pd.DataFrame):
+        return ScenarioPanel.from_long(data, variables=list(techs) + [price])
+    return ScenarioPanel.from_frames(data, variables=list(techs) + [price])
+
+
+def _wavg(w, p):
+    """
+    Production-weighted price per (scenario, tech) over the hours in w.
+
+    w : (scenario, hour, tech) production, p : (scenario, hour) price.
+    Hours with production <= 0 (or NaN) are dropped, like the notebook's wavg.
+    """
+    produced = w > 0
+    w = np.where(produced, w, 0.0)
+    p_nan = np.isnan(p)
+    num = np.einsum('sht,sh->st', w, np.where(p_nan, 0.0, p))
+    den = w.sum(axis=1)
+
+    # a missing price in a producing hour makes the average missing, as np.average would
+    nan_hit = np.einsum('sht,sh->st', produced, p_nan) > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where((den > 0) & ~nan_hit, num / den, np.nan)
+
+
+def capture_prices(data, techs=None, price=PRICE_COL, seasonal=False):
+    """
+    Production-weighted capture prices for all scenarios and technologies.
+
+    data     : ScenarioPanel, long hourly frame (all_h) or list of hourly frames
+    techs    : production columns (default: var_groups.electr)
+    seasonal : False -> index source; True -> index (source, d_summer)
+
+    Besides one column per tech, the result holds 'agg_prod': the price
+    weighted by the summed production of all techs.
+    """
+    techs = list(var_groups.electr if techs is None else techs)
+    panel = _as_panel(data, techs, price)
+
+    w = panel.values[:, :, :len(techs)]
+    p = panel.values[:, :, len(techs)]
+    w = np.concatenate([w, np.nansum(w, axis=2, keepdims=True)], axis=2)   # + agg_prod
+    cols = techs + ['agg_prod']
+
+    if not seasonal:
+        return pd.DataFrame(_wavg(w, p), index=panel.index, columns=cols)
+
+    m = panel.d_summer
+    out = np.stack([_wavg(w[:, ~m], p[:, ~m]), _wavg(w[:, m], p[:, m])], axis=1)
+    return pd.DataFrame(out.reshape(-1, len(cols)), index=panel.season_index, columns=cols)
+
+
+def capture_rates(data, techs=None, price=PRICE_COL, seasonal=False):
+    """
+    Capture rates: each tech's capture price divided by the capture price
+    of aggregate production (same scenario and season).
+
+    The full-year result can be passed directly to
+    descriptive_func.plot_capture_full (after renaming columns).
+    """
+    prices = capture_prices(data, techs=techs, price=price, seasonal=seasonal)
+    return prices.drop(columns='agg_prod').div(prices['agg_prod'], axis=0)
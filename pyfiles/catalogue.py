@@ -0,0 +1,298 @@
+import sqlite3
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+import pyfiles.var_groups as var_groups
+from pyfiles.costs import read_costs, read_costs_text
+from pyfiles.ep_batch import read_log
+from pyfiles.ep_run import RUN_DIR, is_text_export, read_annual_stream, read_annual_text, run_name
+from pyfiles.run_cache import file_hash
+from pyfiles.scenario_functions import load_energyplan_file
+
+CATALOGUE_PATH = Path('0_cache') / 'catalogue.sqlite'
+
+# comparison operators allowed in Catalogue.find
+OPS = ('=', '!=', '<', '<=', '>', '>=')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    source  TEXT PRIMARY KEY,
+    file    TEXT NOT NULL,
+    hash    TEXT NOT NULL,
+    size    INTEGER NOT NULL,
+    mtime   INTEGER NOT NULL,
+    scanned TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS params (
+    source TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    value  REAL,
+    text   TEXT,
+    origin TEXT NOT NULL,
+    PRIMARY KEY (source, name)
+);
+CREATE TABLE IF NOT EXISTS annual (
+    source   TEXT NOT NULL,
+    variable TEXT NOT NULL,
+    value    REAL,
+    PRIMARY KEY (source, variable)
+);
+CREATE TABLE IF NOT EXISTS costs (
+    source TEXT NOT NULL,
+    item   TEXT NOT NULL,
+    value  REAL,
+    PRIMARY KEY (source, item)
+);
+CREATE INDEX IF NOT EXISTS params_name_value ON params (name, value);
+"""
+
+
+def _number(v):
+    """Parameter value -> float (comma decimals accepted), None if not numeric."""
+    if v is None:
+        return None
+    try:
+        x = float(str(v).strip().replace(",", "."))
+    except ValueError:
+        return None
+    return None if np.isnan(x) else x
+
+
+def _real(v):
+    """NaN -> NULL."""
+    return None if pd.isna(v) else float(v)
+
+
+class Catalogue:
+    """
+    SQLite index of the EnergyPLAN runs in 0_EP_runs: the workbooks and
+    the text (-ascii) outputs of the runs ep_batch logged as ok in
+    runs.jsonl.
+
+    Per run (keyed by run name, as 'source' in the frames; the run_id for
+    ep_batch outputs):
+    - runs   : file, content hash, size and mtime
+    - params : input parameters, from (later wins) the scenario file
+               logged by ep_batch, var_groups.caps_by_source and the
+               params logged by ep_batch (sweep points)
+    - annual : annual totals per output column (= column inventory)
+    - costs  : cost items as returned by costs.read_costs
+
+    scan() only re-reads files whose content changed; queries never
+    open a run file.
+
+    Usage:
+        cat = Catalogue()
+        cat.scan()
+        cat.find(("Nuclear_Electr.", ">=", 1000))
+    """
+
+    def __init__(self, path=CATALOGUE_PATH, run_dir=RUN_DIR):
+        self.path = Path(path)
+        self.run_dir = Path(run_dir)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(self.path)
+        self.con.executescript(SCHEMA)
+
+    def __repr__(self):
+        return f"Catalogue({str(self.path)!r})"
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # scanning
+    # ------------------------------------------------------------------
+
+    def _params(self, source, log):
+        """{name: (value, origin)} for one run."""
+        params = {}
+
+        rec = log.get(source)
+        scenario = Path(rec["scenario"]) if rec else None
+        if scenario is not None and scenario.exists():
+            lines, value_idx = load_energyplan_file(scenario)
+            for name, i in value_idx.items():
+                params[name] = (lines[i].strip(), "scenario")
+
+        for name, v in var_groups.caps_by_source.get(source, {}).items():
+            params[name] = (v, "caps")
+
+        if rec:
+            for name, v in rec.get("params", {}).items():
+                params[name] = (v, "sweep")
+
+        return params
+
+    def _files(self, log):
+        """Workbooks plus the ep_batch text outputs logged as ok (a workbook wins on equal names)."""
+        files = {
+            run_name(p): p.name for p in self.run_dir.glob("*.xlsx") if not p.name.startswith("~$")
+        }
+        for rid, rec in log.items():
+            output = rec.get("output")
+            if rec["status"] == "ok" and output and rid not in files and (self.run_dir / output).exists():
+                files[rid] = output
+        return files
+
+    def _scan_one(self, source, file, log):
+        """(Re)index one workbook or text output."""
+        path = self.run_dir / file
+        if path.suffix == ".xlsx":
+            # absolute: the readers resolve relative names against ep_run.RUN_DIR, not run_dir
+            annual = read_annual_stream(path.resolve())
+            costs = read_costs(path.resolve())
+        elif is_text_export(path):
+            annual = read_annual_text(path, source=source)
+            costs = read_costs_text(path)
+        else:
+            raise ValueError("not an EnergyPLAN text export")
+        annual = annual.drop(columns="source").iloc[0]
+        params = self._params(source, log)
+
+        stat = path.stat()
+
+        with self.con:
+            for table in ("runs", "params", "annual", "costs"):
+                self.con.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+            self.con.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (source, file, file_hash(path), stat.st_size, stat.st_mtime_ns,
+                 pd.Timestamp.now().isoformat(timespec="seconds")),
+            )
+            self.con.executemany(
+                "INSERT INTO params VALUES (?, ?, ?, ?, ?)",
+                [(source, n, _number(v), str(v), origin) for n, (v, origin) in params.items()],
+            )
+            self.con.executemany(
+                "INSERT INTO annual VALUES (?, ?, ?)",
+                [(source, str(n), _real(v)) for n, v in annual.items()],
+            )
+            self.con.executemany(
+                "INSERT INTO costs VALUES (?, ?, ?)",
+                [(source, n, _real(v)) for n, v in costs.items()],
+            )
+
+    def scan(self, force=False):
+        """
+        Index every workbook in run_dir and every ep_batch output
+        logged as ok in its runs.jsonl.
+
+        Unchanged files (same size and mtime, or same content hash) are
+        skipped unless force=True; runs whose file is gone are dropped.
+        Returns the list of (re)indexed sources.
+        """
+        known = {
+            row[0]: row[1:]
+            for row in self.con.execute("SELECT source, hash, size, mtime FROM runs")
+        }
+        log = read_log(self.run_dir)
+
+        files = self._files(log)
+
+        updated = []
+        for source, file in sorted(files.items()):
+            stat = (self.run_dir / file).stat()
+            if not force and source in known:
+                digest, size, mtime = known[source]
+                if (size, mtime) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                if digest == file_hash(self.run_dir / file):
+                    with self.con:
+                        self.con.execute(
+                            "UPDATE runs SET size = ?, mtime = ? WHERE source = ?",
+                            (stat.st_size, stat.st_mtime_ns, source),
+                        )
+                    continue
+            try:
+                self._scan_one(source, file, log)
+            except Exception as e:
+                print(f"Warning: {file} skipped ({type(e).__name__}: {e})")
+                continue
+            updated.append(source)
+
+        gone = set(known) - set(files)
+        with self.con:
+            for source in gone:
+                for table in ("runs", "params", "annual", "costs"):
+                    self.con.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+
+        return updated
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+
+    def find(self, *conditions):
+        """
+        Files of the runs matching all conditions.
+
+        conditions : (name, op, value) on params, e.g.
+                     ("Nuclear_Electr.", ">=", 1000)
+                     ("input_RES1_capacity", "<", 6000)
+                     op in OPS; numeric values compare numerically, strings
+                     compare against the raw text.
+        """
+        sql = "SELECT file FROM runs"
+        args = []
+        for name, op, value in conditions:
+            if op not in OPS:
+                raise ValueError(f"Unknown operator: {op!r} (expected one of {OPS})")
+            col = "value" if _number(value) is not None and not isinstance(value, str) else "text"
+            sql += (
+                (" WHERE" if not args else " AND")
+                + f" source IN (SELECT source FROM params WHERE name = ? AND {col} {op} ?)"
+            )
+            args += [name, value]
+        sql += " ORDER BY source"
+        return [row[0] for row in self.con.execute(sql, args)]
+
+    def runs(self):
+        """One row per indexed run."""
+        return pd.read_sql("SELECT * FROM runs ORDER BY source", self.con)
+
+    def _wide(self, table, key, names=None, sources=None):
+        sql = f"SELECT source, {key}, value FROM {table}"
+        where, args = [], []
+        if names is not None:
+            names = list(names)
+            where.append(f"{key} IN ({','.join('?' * len(names))})")
+            args += names
+        if sources is not None:
+            sources = [run_name(s) for s in sources]
+            where.append(f"source IN ({','.join('?' * len(sources))})")
+            args += sources
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        df = pd.read_sql(sql, self.con, params=args)
+        wide = df.pivot(index="source", columns=key, values="value")
+        wide.columns.name = None
+        if names is not None:
+            wide = wide.reindex(columns=[n for n in names if n in wide.columns])
+        return wide
+
+    def params(self, names=None, sources=None):
+        """Numeric parameters, one row per run (index 'source')."""
+        return self._wide("params", "name", names, sources)
+
+    def annual(self, variables=None, sources=None):
+        """Annual totals, one row per run (index 'source')."""
+        return self._wide("annual", "variable", variables, sources)
+
+    def costs(self, sources=None):
+        """Cost block, one row per run (index 'source')."""
+        return self._wide("costs", "item", None, sources)
+
+    def columns(self, source):
+        """Column inventory of one run."""
+        rows = self.con.execute(
+            "SELECT variable FROM annual WHERE source = ? ORDER BY rowid", (run_name(source),)
+        )
+        return [r[0] for r in rows]
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import pyfiles.eds_client as eds_client
+
+STORE_DIR = Path('0_cache') / 'chunks'
+
+
+class ChunkStore:
+    """
+    Local store of historical Energi Data Service time series,
+    partitioned as <root>/<dataset>[/<filter hash>]/<column>/<year>.parquet.
+
+    Only missing (column, year) chunks are downloaded, one request per
+    year for all missing columns of that year. Past years never change,
+    so they are fetched once; the current (and any later) year is
+    refreshed once per ChunkStore instance. A chunk fetched while its
+    year was still running carries a <year>.open marker and is fetched
+    once more after the year has ended. Requested ranges are
+    assembled from the chunks with zero-copy Arrow concatenation and
+    converted to pandas once.
+
+    All times are UTC.
+    """
+
+    def __init__(self, root=STORE_DIR, client=None, time_col="HourUTC", key_cols=("PriceArea",)):
+        self.root = Path(root)
+        self.client = client
+        self.time_col = time_col
+        self.key_cols = list(key_cols)
+        self._refreshed = set()
+
+    def __repr__(self):
+        return f"ChunkStore({str(self.root)!r})"
+
+    def _client(self):
+        return self.client if self.client is not None else eds_client.get_client()
+
+    @staticmethod
+    def _filter_key(filter):
+        """EDS filter (dict or JSON string) as a normalized, hashable string; None stays None."""
+        if filter is None or isinstance(filter, str):
+            return filter
+        return json.dumps(filter, separators=(",", ":"), sort_keys=True)
+
+    def _dir(self, dataset, filter=None):
+        d = self.root / dataset
+        filter = self._filter_key(filter)
+        if filter is not None:
+            d = d / ("f-" + hashlib.sha256(filter.encode()).hexdigest()[:12])
+        return d
+
+    def chunk_path(self, dataset, column, year, filter=None):
+        return self._dir(dataset, filter) / column / f"{year}.parquet"
+
+    def _open_marker(self, dataset, column, year, filter=None):
+        # present while the chunk holds an incomplete (still running) year
+        return self.chunk_path(dataset, column, year, filter).with_suffix(".open")
+
+    # ------------------------------------------------------------------
+    # download
+    # ------------------------------------------------------------------
+
+    def _fetch_year(self, dataset, columns, year, filter=None, refresh=False, complete=True):
+        """
+        Download one calendar year of `columns` and write one chunk per
+        column; complete=False marks the chunks as holding a running year.
+        """
+        df = self._client().get_frame(
+            dataset,
+            refresh=refresh,
+            start=f"{year}-01-01T00:00",
+            end=f"{year + 1}-01-01T00:00",
+            timezone="UTC",
+            filter=filter,
+            columns=[self.time_col] + self.key_cols + list(columns),
+            sort=f"{self.time_col} asc",
+            limit=0,
+        )
+
+        keys = [self.time_col] + self.key_cols
+        if df.empty:
+            df = pd.DataFrame({c: pd.Series(dtype="object") for c in keys + list(columns)})
+        df[self.time_col] = pd.to_datetime(df[self.time_col])
+
+        # fixed row order -> chunks of the same year line up column by column
+        df = df.sort_values(keys, kind="stable").reset_index(drop=True)
+
+        for c in columns:
+            path = self.chunk_path(dataset, c, year, filter)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            part = df[keys + [c]].copy()
+            part[c] = pd.to_numeric(part[c], errors="coerce")
+            tmp = path.with_name(path.name + ".tmp")
+            part.to_parquet(tmp, index=False)
+            marker = self._open_marker(dataset, c, year, filter)
+            if not complete:
+                marker.touch()
+            os.replace(tmp, path)
+            if complete:
+                marker.unlink(missing_ok=True)
+
+    def ensure(self, dataset, columns, years, filter=None):
+        """Download whatever (column, year) chunks are missing or due for refresh."""
+        this_year = pd.Timestamp.now(tz="UTC").year
+        fkey = self._filter_key(filter)
+        for year in years:
+            running = year >= this_year
+            refresh = running and (dataset, fkey, year) not in self._refreshed
+            # fetched before the year ended -> fetched once more, past the client's cached response
+            stale = [] if running else [
+                c for c in columns if self._open_marker(dataset, c, year, filter).exists()
+            ]
+            todo = [
+                c for c in columns
+                if refresh or c in stale or not self.chunk_path(dataset, c, year, filter).exists()
+            ]
+            if not todo:
+                continue
+            refresh = refresh or bool(stale)
+            try:
+                self._fetch_year(dataset, todo, year, filter=filter, refresh=refresh, complete=not running)
+            except eds_client.OfflineCacheMiss:
+                # offline: fall back to the chunks we already have
+                if not all(self.chunk_path(dataset, c, year, filter).exists() for c in todo):
+                    raise
+            if year >= this_year:
+                self._refreshed.add((dataset, fkey, year))
+
+    # ------------------------------------------------------------------
+    # read
+    # ------------------------------------------------------------------
+
+    def _year_table(self, dataset, columns, year, filter=None):
+        keys = [self.time_col] + self.key_cols
+        table = None
+        for c in columns:
+            part = pq.read_table(self.chunk_path(dataset, c, year, filter))
+            if table is None:
+                table = part
+            elif part.num_rows == table.num_rows and part.select(keys).equals(table.select(keys)):
+                table = table.append_column(c, part.column(c))
+            else:
+                # rows do not line up (chunks from different downloads) -> join on the keys
+                table = table.join(part, keys=keys, join_type="full outer").sort_by(
+                    [(k, "ascending") for k in keys]
+                )
+        return table
+
+    def get(self, dataset, columns, start, end, filter=None):
+        """
+        Rows of `dataset` with time in [start, end): time column,
+        key columns and `columns`, downloading only missing chunks.
+        """
+        columns = list(columns)
+        s, e = pd.Timestamp(start), pd.Timestamp(end)
+        years = range(s.year, (e - pd.Timedelta(nanoseconds=1)).year + 1)
+
+        self.ensure(dataset, columns, years, filter=filter)
+
+        tables = [self._year_table(dataset, columns, y, filter) for y in years]
+        df = pa.concat_tables(tables, promote_options="default").to_pandas()
+
+        t = df[self.time_col]
+        return df.loc[(t >= s) & (t < e)].reset_index(drop=True)
+
+
+# shared default store
+_store = None
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = ChunkStore()
+    return _store
+
+
+def set_store(store):
+    global _store
+    _store = store
@@ -1,32 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
+import openpyxl
 import pandas as pd
 
-def get_costs(excel_path, sheet_name=0):
-    df_ = pd.read_excel('0_EP_runs/' + excel_path, sheet_name=sheet_name)
+import pyfiles.profiling as profiling
+from pyfiles.ep_run import HEADER_ROW, RUN_DIR, _text_cells, _text_lines, _to_float, parsed_run, run_name
+
+# cost items of the EnergyPLAN output sheet, in sheet order
+COST_ITEMS = (
+    'Import',
+    'Export',
+    'Variable costs',
+    'Fixed operation costs',
+    'Annual Investment costs',
+    'TOTAL ANNUAL COSTS',
+)
+
+# last row of the cost section
+COST_END = 'TOTAL ANNUAL COSTS'
+
+
+def normalize_label(label):
+    """'Variable costs       ' -> 'variable costs' (whitespace collapsed, case folded)."""
+    if label is None or (isinstance(label, float) and np.isnan(label)):
+        return ''
+    return ' '.join(str(label).split()).casefold()
+
+
+def _pick(rows, items):
+    """
+    Cost values from (label, B, D) rows: the value is column B, else D.
+    Each item is the last row with that label above the TOTAL ANNUAL COSTS
+    row (labels such as 'Import' may also appear higher up the sheet).
+    """
+    wanted = {normalize_label(i): i for i in items}
+    end = normalize_label(COST_END)
+    found = {}
+    for label, b, d in rows:
+        key = normalize_label(label)
+        if key in wanted:
+            v = _to_float(b)
+            found[wanted[key]] = v if not np.isnan(v) else _to_float(d)
+        if key == end:
+            break
+    return {i: found.get(i, np.nan) for i in items}
+
 
-    # 1. get relevant rows
-    df = df_[(df_.index >= 53) & (df_.index < 67)].copy()
-    df = df[['Unnamed: 0', 'Unnamed: 1', 'Unnamed: 3']]
+def _stream_rows(excel_path, sheet_name=0):
+    """(A, B, D) cells of the rows above the hourly headers, streamed read-only."""
+    wb = openpyxl.load_workbook(RUN_DIR / excel_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        # raw frame index i is sheet row i + 2
+        for row in ws.iter_rows(min_row=2, max_row=HEADER_ROW + 1, max_col=4, values_only=True):
+            row = tuple(row) + (None,) * (4 - len(row))
+            yield row[0], row[1], row[3]
+    finally:
+        wb.close()
 
-    # keep only the rows you want
-    df = df.loc[[53, 54, 60, 62, 64, 66]]
 
-    # make numeric before filling -> no FutureWarning
-    df['Unnamed: 1'] = pd.to_numeric(df['Unnamed: 1'], errors='coerce')
-    df['Unnamed: 3'] = pd.to_numeric(df['Unnamed: 3'], errors='coerce')
+@profiling.profiled
+def read_costs(excel_path, sheet_name=0, items=COST_ITEMS):
+    """
+    Cost items of one run (M EUR) as a float Series named after the run.
+
+    Rows are found by label, not position. A workbook already parsed in
+    this session (ep_run.open_run) is reused; otherwise only the rows
+    above the hourly block are streamed, stopping at TOTAL ANNUAL COSTS.
+    """
+    run = parsed_run(excel_path, sheet_name=sheet_name)
+    if run is not None:
+        raw = run.raw[run.raw.index < HEADER_ROW]
+        cols = raw.columns
+        pad = [None] * len(raw)
+        rows = zip(
+            raw[cols[0]],
+            raw[cols[1]] if len(cols) > 1 else pad,
+            raw[cols[3]] if len(cols) > 3 else pad,
+        )
+        values = _pick(rows, items)
+    else:
+        rows = _stream_rows(excel_path, sheet_name=sheet_name)
+        try:
+            values = _pick(rows, items)
+        finally:
+            rows.close()
+
+    return pd.Series(values, name=Path(excel_path).stem, dtype=float)
+
+
+@profiling.profiled
+def read_costs_text(text_path, items=COST_ITEMS, sep="\t", encoding=None):
+    """
+    Cost items of an EnergyPLAN text export (e.g. an ep_batch output),
+    as read_costs. Reads only the lines above the hourly headers.
+    """
+    lines = _text_lines(text_path, HEADER_ROW + 1, encoding)
+    rows = []
+    for line in lines[1:]:      # sheet rows 2.. (raw frame index 0..)
+        cells = _text_cells(line, sep) + [None] * 4
+        rows.append((cells[0], cells[1], cells[3]))
+    return pd.Series(_pick(rows, items), name=run_name(text_path), dtype=float)
+
+
+@profiling.profiled
+def get_costs(excel_path, sheet_name=0):
+    """1-row cost table: index = run name, columns = COST_ITEMS (M EUR)."""
+    df = read_costs(excel_path, sheet_name=sheet_name).to_frame().T
+    df.columns.name = 'Case (M EUR)'
+    return df
 
-    # fill NaNs in Unnamed: 1 with Unnamed: 3
-    df['Unnamed: 1'] = df['Unnamed: 1'].fillna(df['Unnamed: 3'])
 
-    # drop helper column
-    df = df[['Unnamed: 0', 'Unnamed: 1']]
+@profiling.profiled
+def cost_matrix(paths, sheet_name=0, items=COST_ITEMS, workers=1):
+    """
+    (runs x cost items) float table for many runs.
 
-    # 2. rename
-    df = df.rename(columns={
-        'Unnamed: 0': 'Case (M EUR)',
-        'Unnamed: 1': Path(excel_path).stem
-    })
+    paths   : file names relative to 0_EP_runs (as in var_groups)
+    workers : >1 reads the workbooks in that many processes
+    """
+    paths = list(paths)
+    args = (paths, [sheet_name] * len(paths), [items] * len(paths))
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(read_costs, *args))
+    else:
+        rows = list(map(read_costs, *args))
 
-    # 3. transpose
-    df = df.set_index('Case (M EUR)').T
-    return df
\ No newline at end of file
+    df = pd.DataFrame(rows)
+    df.index.name = 'source'
+    df.columns.name = 'Case (M EUR)'
+    return df
@@ -5,6 +5,9 @@ import numpy as np
 import matplotlib.colors as mcolors
 from pathlib import Path
 
+import pyfiles.fig_cache as fig_cache
+import pyfiles.profiling as profiling
+
 # aggregate composition
 # def plot_stacked_by_source(
 #     demand_df,
@@ -83,6 +86,7 @@ from pathlib import Path
 #     return fig, ax
 
 # for capture rates 1 (yearly)
+@profiling.profiled(sizes=False)
 def plot_capture_full(
     capture_full,
     plot_two=True,
@@ -96,6 +100,7 @@ def plot_capture_full(
     show=True,            # NEW
     close=False,          # NEW
     rotate=True,
+    cache=False,          # skip re-rendering/saving when savepath is up to date
 ):
     """
     Two barplots of capture_full:
@@ -104,6 +109,10 @@ def plot_capture_full(
 
     Index: source
     Columns: technologies
+
+    With the opt-in cache=True and a savepath, an up-to-date file (same data,
+    arguments and rcParams, see fig_cache) is not saved again; with
+    show=False nothing is rendered (returns None, None).
     """
 
     # work on a copy so we don't mutate original
@@ -126,7 +135,9 @@ def plot_capture_full(
         if save_kwargs:
             skw.update(save_kwargs)
 
-        fig.savefig(outpath, **skw)
+        with profiling.stage('savefig') as rec:
+            fig.savefig(outpath, **skw)
+            rec['bytes'] = outpath.stat().st_size
 
     # resolve output paths (auto add _full / _zoom)
     base = None
@@ -142,6 +153,18 @@ def plot_capture_full(
     else:
         full_path = zoom_path = None
 
+    # figure cache
+    fig_key = up_to_date = None
+    if full_path is not None and cache:
+        fig_key = fig_cache.figure_key(capture_full, dict(
+            plot_two=plot_two, axline=axline, source_labels=source_labels, colors=colors,
+            title=title, dpi=dpi, save_kwargs=save_kwargs, rotate=rotate,
+        ))
+        up_to_date = fig_cache.is_current(full_path, fig_key)
+        if up_to_date and not show:
+            print(f"Up to date, not re-rendered: {full_path}")
+            return None, None
+
     # --- 1) Full scale ---
     fig1, ax1 = plt.subplots(figsize=(12, 6))
     df.T.plot(kind='bar', ax=ax1, color=colors)
@@ -170,8 +193,10 @@ def plot_capture_full(
 
     plt.tight_layout()
 
-    if full_path is not None:
+    if full_path is not None and not up_to_date:
         _save_fig(fig1, full_path)
+        if fig_key is not None:
+            fig_cache.record(full_path, fig_key)
 
     if show:
         plt.show()
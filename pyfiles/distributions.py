@@ -0,0 +1,59 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+import numpy as np
+
+# EnergyPLAN's distribution folder (relative to this repo)
+DIST_DIR = Path('..') / 'ZipEnergyPLAN163' / 'energyPlan Data' / 'Distributions'
+
+
+def distribution_path(name, year_label=None, out_dir=None):
+    """<out_dir>/<year_label>_<name>.txt (out_dir defaults to DIST_DIR)."""
+    out_dir = DIST_DIR if out_dir is None else Path(out_dir)
+    stem = f"{year_label}_{name}" if year_label is not None else name
+    return out_dir / f"{stem}.txt"
+
+
+def format_distribution(values, newline=os.linesep):
+    """
+    File content of a distribution: one value per line, byte-identical
+    to Series.to_csv(sep="\\t", index=False, header=False) for float and
+    integer input (shortest round-trip float repr, '""' for NaN, integers
+    without '.0'). Anything else is formatted as float.
+    """
+    vals = np.asarray(values)
+    if vals.dtype.kind in "iu":
+        text = newline.join(map(str, vals.tolist())) + newline
+    else:
+        vals = vals.astype(float).tolist()
+        text = newline.join(map(repr, vals)).replace("nan", '""') + newline
+    return text.encode("utf-8")
+
+
+def write_distribution(values, path, newline=os.linesep):
+    """
+    Write a distribution file atomically (temp file + rename).
+
+    Nothing is written when the file already has the same content, so
+    EnergyPLAN's data folder is left untouched on unchanged reruns.
+    Returns True if the file was (re)written.
+    """
+    path = Path(path)
+    data = format_distribution(values, newline=newline)
+
+    if path.exists():
+        with open(path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return True
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "https://api.energidataservice.dk/dataset"
+
+# on-disk response cache
+CACHE_DIR = Path('0_cache') / 'eds'
+
+# responses whose time range reaches into the future are re-fetched after this many seconds
+OPEN_RANGE_TTL = 24 * 3600
+
+
+class OfflineCacheMiss(LookupError):
+    """Raised in offline mode when a request is not in the cache."""
+
+
+class EDSClient:
+    """
+    Client for the Energi Data Service API.
+
+    - one shared requests.Session (connection pooling)
+    - retry with exponential backoff on connection errors, 429 and 5xx
+    - on-disk JSON cache keyed by dataset, columns, filter and time range
+    - offline mode: serve only from the cache, never touch the network
+
+    base_url can point to a local stand-in server for testing.
+    """
+
+    def __init__(
+        self,
+        base_url=BASE_URL,
+        cache_dir=CACHE_DIR,
+        offline=False,
+        use_cache=True,
+        retries=5,
+        backoff=0.5,
+        timeout=60,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = Path(cache_dir)
+        self.offline = offline
+        self.use_cache = use_cache
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __repr__(self):
+        return f"EDSClient({self.base_url!r}, offline={self.offline})"
+
+    # ------------------------------------------------------------------
+    # cache
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def build_params(columns=None, start=None, end=None, filter=None,
+                     timezone=None, sort=None, limit=0, **extra):
+        """Query parameters in the form the API expects (None entries dropped)."""
+        if filter is not None and not isinstance(filter, str):
+            filter = json.dumps(filter, separators=(",", ":"))
+        if columns is not None and not isinstance(columns, str):
+            columns = ",".join(columns)
+        params = {
+            "start": start,
+            "end": end,
+            "timezone": timezone,
+            "filter": filter,
+            "columns": columns,
+            "sort": sort,
+            "limit": limit,
+            **extra,
+        }
+        return {k: v for k, v in params.items() if v is not None}
+
+    def cache_path(self, dataset, params):
+        key = json.dumps({"dataset": dataset, **params}, sort_keys=True, default=str)
+        digest = hashlib.sha256(key.encode()).hexdigest()[:24]
+        return self.cache_dir / f"{dataset}_{digest}.json"
+
+    @staticmethod
+    def _is_fresh(path, params):
+        """Closed past ranges never expire; ranges reaching past now expire after OPEN_RANGE_TTL."""
+        end = params.get("end")
+        if end is not None and str(end).lower() != "now":
+            try:
+                closed = pd.Timestamp(end).tz_localize(None) <= pd.Timestamp.now()
+            except (ValueError, TypeError):
+                closed = False
+            if closed:
+                return True
+        return time.time() - path.stat().st_mtime < OPEN_RANGE_TTL
+
+    # ------------------------------------------------------------------
+    # requests
+    # ------------------------------------------------------------------
+
+    def get_records(self, dataset, refresh=False, **query):
+        """
+        Records of `dataset` for the given query (columns, start, end,
+        filter, timezone, sort, limit, ...), as a list of dicts.
+
+        refresh=True ignores any cached response.
+        """
+        params = self.build_params(**query)
+        path = self.cache_path(dataset, params)
+
+        if self.use_cache and not refresh and path.exists():
+            if self.offline or self._is_fresh(path, params):
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)
+
+        if self.offline:
+            raise OfflineCacheMiss(f"{dataset} {params} is not cached (offline mode)")
+
+        r = self.session.get(f"{self.base_url}/{dataset}", params=params, timeout=self.timeout)
+        r.raise_for_status()
+        records = r.json().get("records", [])
+
+        if self.use_cache:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+            os.replace(tmp, path)
+
+        return records
+
+    def get_frame(self, dataset, refresh=False, **query):
+        """Same as get_records, as a DataFrame."""
+        return pd.DataFrame(self.get_records(dataset, refresh=refresh, **query))
+
+
+# shared default client (offline when EDS_OFFLINE=1)
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = EDSClient(offline=os.environ.get("EDS_OFFLINE", "") == "1")
+    return _client
+
+
+def set_client(client):
+    """Replace the shared client, e.g. with one pointing at a local test server."""
+    global _client
+    _client = client
@@ -0,0 +1,152 @@
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import pandas as pd
+
+from pyfiles.ep_run import ASCII_SUFFIX, RUN_DIR
+from pyfiles.sweep import read_manifest
+
+# EnergyPLAN executable (override with the ENERGYPLAN_EXE environment variable)
+EXE = Path(os.environ.get("ENERGYPLAN_EXE", Path('..') / 'ZipEnergyPLAN163' / 'energyPLAN.exe'))
+
+# command line per run; {exe}, {input}, {output} and {run_id} are filled in.
+# Swap in e.g. ["python", "fake_ep.py", "{input}", "{output}"] to test without EnergyPLAN.
+COMMAND = ["{exe}", "-i", "{input}", "-ascii", "{output}"]
+
+LOG_NAME = "runs.jsonl"
+
+
+def _jobs(scenarios):
+    """
+    (run_id, scenario path, params) per run.
+
+    scenarios : manifest csv (sweep.write_sweep) or iterable of scenario files;
+                for plain files the run id is the file stem.
+    """
+    if isinstance(scenarios, (str, Path)) and Path(scenarios).suffix == ".csv":
+        base = Path(scenarios).parent
+        for row in read_manifest(scenarios):
+            rid, scen = row.pop("run_id"), row.pop("scenario")
+            yield rid, base / scen, row
+    else:
+        for scen in scenarios:
+            scen = Path(scen)
+            yield scen.stem, scen, {}
+
+
+def read_log(out_dir=RUN_DIR):
+    """All records of <out_dir>/runs.jsonl (later records of a run win)."""
+    path = Path(out_dir) / LOG_NAME
+    records = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue    # half-written last line after a crash
+                records[rec["run_id"]] = rec
+    return records
+
+
+def _run_one(run_id, scenario, output, exe, command, timeout):
+    """Run one scenario; the output is written to a tmp name and moved in place on success."""
+    tmp = output.with_name(output.stem + ".part" + output.suffix)
+    cmd = [
+        str(c).format(exe=exe, input=Path(scenario).resolve(), output=tmp.resolve(), run_id=run_id)
+        for c in command
+    ]
+
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        returncode, stderr = proc.returncode, proc.stderr[-2000:]
+    except subprocess.TimeoutExpired:
+        returncode, stderr = None, f"timeout after {timeout} s"
+    except OSError as e:
+        returncode, stderr = None, f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - t0
+
+    if returncode == 0 and tmp.exists():
+        os.replace(tmp, output)
+        status = "ok"
+    else:
+        tmp.unlink(missing_ok=True)
+        status = "failed"
+        if returncode == 0:
+            stderr = (stderr + "\nno output written").strip()
+
+    return {"status": status, "returncode": returncode, "wall_time": round(wall, 3), "stderr": stderr}
+
+
+def run_batch(
+    scenarios,
+    out_dir=RUN_DIR,
+    exe=EXE,
+    command=COMMAND,
+    workers=4,
+    timeout=None,
+    suffix=ASCII_SUFFIX,
+    resume=True,
+):
+    """
+    Run many EnergyPLAN scenarios in a bounded worker pool.
+
+    scenarios : manifest csv from sweep.write_sweep, or scenario files
+    out_dir   : results land in <out_dir>/<run_id><suffix>, by default
+                <run_id>.ascii.txt: next to a <run_id>.xlsx the text export
+                is read in its place (ep_run.text_sibling)
+    command   : command template (see COMMAND)
+    workers   : number of simultaneous EnergyPLAN processes
+    timeout   : seconds per run (None = no limit)
+    resume    : skip runs already logged as ok whose output still exists
+
+    Every finished run is appended to <out_dir>/runs.jsonl right away
+    (run_id, scenario, output, params, status, returncode, wall_time),
+    so a crashed batch picks up where it stopped. Returns the records of
+    this call as a DataFrame.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    done = set()
+    if resume:
+        done = {
+            rid for rid, rec in read_log(out_dir).items()
+            if rec["status"] == "ok" and (out_dir / rec["output"]).exists()
+        }
+
+    jobs = [(rid, scen, params) for rid, scen, params in _jobs(scenarios) if rid not in done]
+
+    records = []
+
+    with open(out_dir / LOG_NAME, "a", encoding="utf-8") as log, \
+         ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+
+        futures = {
+            pool.submit(_run_one, rid, scen, out_dir / f"{rid}{suffix}", exe, command, timeout):
+                (rid, scen, params)
+            for rid, scen, params in jobs
+        }
+        for fut in as_completed(futures):
+            rid, scen, params = futures[fut]
+            rec = {
+                "run_id": rid,
+                "scenario": str(scen),
+                "output": f"{rid}{suffix}",
+                "params": params,
+                **fut.result(),
+                "finished": pd.Timestamp.now().isoformat(timespec="seconds"),
+            }
+            log.write(json.dumps(rec) + "\n")
+            log.flush()
+            records.append(rec)
+
+    cols = ["run_id", "scenario", "output", "status", "returncode", "wall_time", "finished", "params", "stderr"]
+    return pd.DataFrame(records, columns=cols)
@@ -0,0 +1,560 @@
+from collections import OrderedDict
+import io
+from functools import cached_property
+from operator import itemgetter
+from pathlib import Path
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import pyfiles.profiling as profiling
+
+# folder holding the EnergyPLAN output workbooks
+RUN_DIR = Path('0_EP_runs')
+
+# row layout of the EnergyPLAN output sheet (index of the raw read_excel frame)
+HEADER_ROW = 79          # two header rows start here
+
+# row layout below the two header rows
+ANNUAL_ROW = 2
+MONTH_ROWS = (5, 16)     # inclusive
+HOURLY_START = 23
+
+# number of parsed workbooks kept in memory by open_run
+MAX_OPEN_RUNS = 8
+
+# hours in an EnergyPLAN year
+N_HOURS = 8784
+
+# EnergyPLAN -ascii export of a run, saved next to its workbook as <stem>.ascii.txt
+# (a distinct name so scenario input .txt files are never mistaken for output)
+ASCII_SUFFIX = '.ascii.txt'
+
+# tech-level heat aggregates -> unit columns they are built from
+HEAT_UNITS = {
+    'Solar_tot_Heat': ['Solar_Heat', 'Solar2_Heat'],
+    'CSHP_tot_Heat':  ['CSHP 2_Heat', 'CSHP 3_Heat'],
+    'CHP_tot_Heat':   ['CHP 2_Heat', 'CHP 3_Heat'],
+    'HP_tot_Heat':    ['HP 2_Heat', 'HP 3_Heat'],
+    'Storage_Heat':   ['Storage2_Heat','Storage3_Heat']
+}
+
+# aggregator helper
+def aggregate_heat_units(df):
+    """
+    Aggregate unit-specific heat columns into tech-level aggregates
+    and drop the original unit columns.
+
+    Returns a *copy* of df with new columns:
+    - Solar_tot_Heat
+    - CSHP_tot_Heat
+    - CHP_tot_Heat
+    - HP_tot_Heat
+    """
+    agg_map = HEAT_UNITS
+
+    df = df.copy()
+
+    # create aggregates
+    for new_col, old_cols in agg_map.items():
+        existing = [c for c in old_cols if c in df.columns]
+        if existing:
+            df[new_col] = df[existing].sum(axis=1)
+
+    # drop originals
+    cols_to_drop = {c for cols_ in agg_map.values() for c in cols_ if c in df.columns}
+    if cols_to_drop:
+        df = df.drop(columns=list(cols_to_drop))
+
+    return df
+
+
+def merge_headers(row1, row2):
+    """Merge the two EnergyPLAN header rows into 'X_Y' column names."""
+    return [
+        f"{str(col1).strip()}_{str(col2).strip()}" if col2 else str(col1).strip()
+        for col1, col2 in zip(row1, row2)
+    ]
+
+
+def clean_hourly(hourly, source):
+    """
+    Turn numeric hourly rows with merged headers into the cleaned
+    hourly frame: 'hour', 'source', 'd_summer' and aggregated heat units.
+    """
+    # 1a. enforce that the *first* column is called 'hour'
+    first_col = hourly.columns[0]
+    hourly = hourly.rename(columns={first_col: "hour"})
+
+    # 1b. if there were any duplicate 'hour' columns, keep the first
+    hourly = hourly.loc[:, ~hourly.columns.duplicated()]
+
+    # 1c. add tag and summer dummy
+    hourly["source"] = source
+    hourly["d_summer"] = (hourly["hour"] >= 3649) & (hourly["hour"] < 5857)
+
+    # 2. arrange columns: hour, source, d_summer, rest...
+    cols = hourly.columns.tolist()
+    cols.remove("source")
+    cols.remove("d_summer")
+    cols.insert(1, "source")
+    cols.insert(2, "d_summer")
+    hourly = hourly[cols]
+
+    # 3. aggregate heat units
+    return aggregate_heat_units(hourly)
+
+
+def memory_mb(df):
+    """Memory use of a frame in MB (object/string columns counted in full)."""
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def compact_hourly(df, report=False):
+    """
+    Memory-compact copy of an hourly frame (single run or concatenated):
+    float32 value columns, categorical 'source', int16 'hour' (kept as is
+    if it has gaps) and bool 'd_summer'. About half the size of the
+    float64 frame; values keep ~7 significant digits.
+
+    report=True prints the memory use before and after.
+    """
+    before = memory_mb(df) if report else None
+    out = df.copy()
+
+    if "source" in out.columns and not isinstance(out["source"].dtype, pd.CategoricalDtype):
+        out["source"] = pd.Categorical(out["source"], categories=list(dict.fromkeys(out["source"])))
+    if "hour" in out.columns and out["hour"].notna().all():
+        out["hour"] = out["hour"].astype(np.int16)
+    if "d_summer" in out.columns:
+        out["d_summer"] = out["d_summer"].astype(bool)
+
+    values = [c for c in out.columns if c not in ("hour", "source", "d_summer")
+              and pd.api.types.is_numeric_dtype(out[c]) and not pd.api.types.is_bool_dtype(out[c])]
+    out[values] = out[values].astype(np.float32)
+
+    if report:
+        print(f"hourly frame: {before:.1f} MB -> {memory_mb(out):.1f} MB")
+    return out
+
+
+class EPRun:
+    """
+    One EnergyPLAN output workbook, parsed once.
+
+    The sheet is read on first access and the hourly, monthly and
+    annual blocks are sliced lazily from that single parse (cost items:
+    costs.read_costs, by label).
+    """
+
+    def __init__(self, excel_path, sheet_name=0):
+        self.excel_path = excel_path
+        self.sheet_name = sheet_name
+        self.source = Path(excel_path).stem
+        self.path = RUN_DIR / excel_path
+
+    def __repr__(self):
+        return f"EPRun({self.excel_path!r})"
+
+    @cached_property
+    def raw(self):
+        """The whole sheet as returned by pd.read_excel."""
+        with profiling.stage('read_excel') as rec:
+            df = pd.read_excel(self.path, sheet_name=self.sheet_name)
+            rec['rows'] = len(df)
+        return df
+
+    @cached_property
+    def block(self):
+        """Everything below the two header rows, with merged column names."""
+        df = self.raw[self.raw.index >= HEADER_ROW].copy()
+        df.columns = merge_headers(df.iloc[0], df.iloc[1])
+        return df.iloc[2:].reset_index(drop=True)
+
+    @cached_property
+    def hourly(self):
+        """Cleaned hourly frame (one row per hour), from the text export if present."""
+        text_path = text_sibling(self.excel_path)
+        if text_path is not None:
+            return read_hourly_text(text_path, source=self.source)
+        hourly = self.block[self.block.index >= HOURLY_START].copy()
+        with profiling.stage('to_numeric') as rec:
+            hourly = hourly.apply(pd.to_numeric, errors='coerce')
+            rec['rows'] = len(hourly)
+        return clean_hourly(hourly, self.source)
+
+    @cached_property
+    def monthly(self):
+        """Cleaned monthly frame (one row per month)."""
+        first, last = MONTH_ROWS
+        monthly = self.block[(self.block.index >= first) & (self.block.index <= last)].copy()
+
+        # rename first column to 'month' BEFORE numeric conversion
+        first_col = monthly.columns[0]
+        monthly = monthly.rename(columns={first_col: "month"})
+        monthly = monthly.loc[:, ~monthly.columns.duplicated()]
+        monthly["source"] = self.source
+
+        # put 'source' as second column
+        cols = monthly.columns.tolist()
+        cols.remove("source")
+        cols.insert(1, "source")
+        monthly = monthly[cols]
+
+        # ensure numeric for data columns only (not month/source)
+        data_cols = [c for c in monthly.columns if c not in ["month", "source"]]
+        monthly[data_cols] = monthly[data_cols].apply(
+            pd.to_numeric,
+            errors="coerce"
+        )
+
+        return aggregate_heat_units(monthly)
+
+    @cached_property
+    def annual(self):
+        """1-row frame with annual totals and a leading 'source' column."""
+        annual = self.block[self.block.index == ANNUAL_ROW].copy()
+
+        # drop the row label, keep one column per name
+        annual = annual.drop(columns=annual.columns[0])
+        annual = annual.loc[:, ~annual.columns.duplicated()]
+        annual = annual.apply(pd.to_numeric, errors='coerce')
+
+        annual.insert(0, "source", self.source)
+        return aggregate_heat_units(annual)
+
+
+# small in-memory registry so repeated readers share one parse
+_open_runs = OrderedDict()
+
+def open_run(excel_path, sheet_name=0):
+    """
+    Return the EPRun for excel_path, reusing an earlier parse
+    as long as the file on disk is unchanged.
+    """
+    key = (str(excel_path), sheet_name)
+    mtime = (RUN_DIR / excel_path).stat().st_mtime_ns
+
+    hit = _open_runs.get(key)
+    if hit is not None and hit[0] == mtime:
+        _open_runs.move_to_end(key)
+        return hit[1]
+
+    run = EPRun(excel_path, sheet_name=sheet_name)
+    _open_runs[key] = (mtime, run)
+    while len(_open_runs) > MAX_OPEN_RUNS:
+        _open_runs.popitem(last=False)
+    return run
+
+
+def parsed_run(excel_path, sheet_name=0):
+    """
+    The EPRun of excel_path if its sheet is already parsed in memory
+    and the file is unchanged, else None (never parses).
+    """
+    hit = _open_runs.get((str(excel_path), sheet_name))
+    if hit is None or "raw" not in vars(hit[1]):
+        return None
+    if hit[0] != (RUN_DIR / excel_path).stat().st_mtime_ns:
+        return None
+    return hit[1]
+
+
+# -------------------------------------------------------------------------------
+# streaming hourly reader
+# -------------------------------------------------------------------------------
+
+def _merged_names(h1, h2):
+    """Merged names of two raw header rows (empty cells -> NaN, as in the pandas reader)."""
+    width = max(len(h1), len(h2))
+    h1 = [np.nan if v is None else v for v in h1] + [np.nan] * (width - len(h1))
+    h2 = [np.nan if v is None else v for v in h2] + [np.nan] * (width - len(h2))
+    return merge_headers(h1, h2)
+
+
+def _hourly_columns(h1, h2, columns=None):
+    """
+    Merge two raw header rows and pick the positions to parse: first occurrence of each name, limited
+    to `columns` (plus 'hour' and heat unit columns) when given.
+    """
+    names = _merged_names(h1, h2)
+    names[0] = "hour"
+
+    if columns is not None:
+        wanted = {"hour"}
+        for c in columns:
+            wanted.update(HEAT_UNITS.get(c, [c]))
+        missing = [c for c in columns if c not in names and c not in HEAT_UNITS]
+        if missing:
+            print("Warning: columns not found and will be skipped:", missing)
+
+    keep, seen = [], set()
+    for j, name in enumerate(names):
+        if name in seen or (columns is not None and name not in wanted):
+            continue
+        seen.add(name)
+        keep.append(j)
+
+    return names, keep
+
+
+def _subset(hourly, columns):
+    """Restrict a cleaned hourly frame to hour/source/d_summer + `columns`."""
+    if columns is None:
+        return hourly
+    cols = ["hour", "source", "d_summer"] + [c for c in columns if c in hourly.columns and c != "hour"]
+    return hourly[cols]
+
+
+def _to_float(v):
+    """Cell value -> float, NaN for anything non-numeric (like pd.to_numeric coerce)."""
+    if v is None:
+        return np.nan
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def read_hourly_stream(excel_path, sheet_name=0, columns=None):
+    """
+    Read only the hourly block of an EnergyPLAN workbook.
+
+    The workbook is opened read-only and rows are streamed: the two
+    header rows are merged into column names and the hourly rows are
+    written straight into a preallocated float64 array, so no full-sheet
+    DataFrame is ever built.
+
+    columns : optional subset (e.g. var_groups.electr); other columns are
+              skipped while parsing. Aggregated heat columns such as
+              'HP_tot_Heat' pull in their unit columns automatically.
+
+    Returns the same schema as EPRun.hourly (all values float64).
+    """
+    path = RUN_DIR / excel_path
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+
+        # raw frame index i is sheet row i + 2 (row 1 is the pandas header)
+        rows = ws.iter_rows(min_row=HEADER_ROW + 2, values_only=True)
+
+        # 1.-2. merged header names and the column positions to keep
+        h1, h2 = next(rows), next(rows)
+        names, keep = _hourly_columns(h1, h2, columns)
+        width = len(names)
+        get = itemgetter(*keep) if len(keep) > 1 else (lambda r, j=keep[0]: (r[j],))
+
+        # 3. skip the annual/monthly rows above the hourly block
+        for _ in range(HOURLY_START):
+            next(rows)
+
+        # 4. fill preallocated array row by row
+        out = np.full((N_HOURS, len(keep)), np.nan)
+        n = last = 0
+        for row in rows:
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            if n == len(out):
+                out = np.concatenate([out, np.full_like(out, np.nan)])
+            vals = get(row)
+            out[n] = [v if type(v) in (int, float) else _to_float(v) for v in vals]
+            n += 1
+            if any(v is not None for v in vals):
+                last = n
+    finally:
+        wb.close()
+
+    # 5. trailing empty rows are dropped, as in pd.read_excel
+    hourly = pd.DataFrame(
+        out[:last],
+        columns=[names[j] for j in keep],
+        index=pd.RangeIndex(HOURLY_START, HOURLY_START + last),
+    )
+    hourly = clean_hourly(hourly, Path(excel_path).stem)
+    return _subset(hourly, columns)
+
+
+def read_annual_stream(excel_path, sheet_name=0):
+    """
+    Read only the annual totals of an EnergyPLAN workbook.
+
+    Streams the two header rows and the rows down to the annual row,
+    then stops; the hourly block is never touched.
+
+    Returns the same 1-row frame as EPRun.annual.
+    """
+    path = RUN_DIR / excel_path
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        first = HEADER_ROW + 2
+        rows = list(ws.iter_rows(min_row=first, max_row=first + 2 + ANNUAL_ROW, values_only=True))
+    finally:
+        wb.close()
+
+    return _annual_frame(rows, Path(excel_path).stem)
+
+
+def _annual_frame(rows, source):
+    """EPRun.annual from the two header rows and the rows below them, down to ANNUAL_ROW."""
+    names = _merged_names(rows[0], rows[1])
+    row = rows[2 + ANNUAL_ROW] if len(rows) > 2 + ANNUAL_ROW else ()
+    row = tuple(row) + (None,) * (len(names) - len(row))
+
+    # drop the row label column (by name, as EPRun.annual), keep first occurrence of each name
+    values = {}
+    for name, v in zip(names, row):
+        if name != names[0] and name not in values:
+            values[name] = _to_float(v)
+
+    annual = pd.DataFrame([values], index=[ANNUAL_ROW])
+    annual.insert(0, "source", source)
+    return aggregate_heat_units(annual)
+
+
+# -------------------------------------------------------------------------------
+# text (ASCII) hourly reader
+# -------------------------------------------------------------------------------
+
+def text_sibling(excel_path):
+    """
+    Path of the EnergyPLAN text export next to excel_path
+    (<stem>.ascii.txt), or None. A file whose layout does not pass
+    is_text_export is ignored with a warning, so the workbook is read.
+    """
+    excel_path = Path(excel_path)
+    path = RUN_DIR / excel_path.parent / (excel_path.stem + ASCII_SUFFIX)
+    if not path.exists():
+        return None
+    if not is_text_export(path):
+        print(f"Warning: {path.name} does not look like an EnergyPLAN text export; reading the workbook")
+        return None
+    return path
+
+
+def run_name(path):
+    """Run name of a workbook or text export: A.xlsx, A.ascii.txt, A.txt -> 'A'."""
+    name = Path(path).name
+    return name[:-len(ASCII_SUFFIX)] if name.endswith(ASCII_SUFFIX) else Path(name).stem
+
+
+def _sniff_encoding(head):
+    return 'utf-16' if head[:2] in (b'\xff\xfe', b'\xfe\xff') else 'latin-1'
+
+
+def _text_lines(text_path, n_lines, encoding=None):
+    """First n_lines lines of a text file without line endings (UTF-16 BOM sniffed, else latin-1)."""
+    if encoding is None:
+        with open(text_path, 'rb') as f:
+            encoding = _sniff_encoding(f.read(2))
+    lines = []
+    with open(text_path, encoding=encoding, newline='') as f:
+        for line in f:
+            lines.append(line.rstrip('\r\n'))
+            if len(lines) == n_lines:
+                break
+    return lines
+
+
+def _text_cells(line, sep="\t"):
+    """One line of a text export as cells, empty cells -> None (as openpyxl)."""
+    return [v if v.strip() else None for v in line.split(sep)]
+
+
+def is_text_export(text_path, sep="\t", decimal=".", encoding=None):
+    """
+    Cheap layout check of a text export before it replaces a workbook:
+    named columns in the two header lines, and a numeric hour and values
+    that parse with `decimal` in the first hourly line, at the positions
+    of the Excel sheet. Reads only the lines above the hourly block.
+    """
+    first = HEADER_ROW + 1
+    n_lines = first + 2 + HOURLY_START + 1
+    try:
+        lines = _text_lines(text_path, n_lines, encoding)
+    except (OSError, UnicodeError):
+        return False
+    if len(lines) < n_lines:
+        return False
+
+    h1, h2 = lines[first].split(sep), lines[first + 1].split(sep)
+    if not any(v.strip() for v in h1[1:] + h2[1:]):
+        return False
+    hour, *values = lines[-1].split(sep)
+    values = [v.strip() for v in values if v.strip()]
+    if not values:
+        return False
+    # a value that does not parse with `decimal` (e.g. a comma-decimal
+    # export read with decimal='.') would turn into NaN in read_hourly_text
+    if decimal != '.' and any('.' in v for v in values):
+        return False
+    try:
+        float(hour)
+        for v in values:
+            float(v.replace(decimal, '.'))
+    except ValueError:
+        return False
+    return True
+
+
+def read_annual_text(text_path, source=None, sep="\t", encoding=None):
+    """
+    Annual totals of an EnergyPLAN text export (e.g. an ep_batch output):
+    the same 1-row frame as read_annual_stream. Reads only the lines down
+    to the annual row.
+    """
+    first = HEADER_ROW + 1     # sheet row n is line n (1-based)
+    lines = _text_lines(text_path, first + 3 + ANNUAL_ROW, encoding)
+    rows = [_text_cells(line, sep) for line in lines[first:]]
+    return _annual_frame(rows, source if source is not None else run_name(text_path))
+
+
+def read_hourly_text(text_path, source=None, columns=None, sep="\t", decimal=".", encoding=None):
+    """
+    Read the hourly block of an EnergyPLAN text (ASCII) export.
+
+    The export has the same row layout as the Excel sheet. Only the
+    header lines are split in Python; the hourly block is handed to the
+    pandas C parser in one go.
+
+    source   : value of the 'source' column (default: file name without .ascii.txt / .txt)
+    columns  : optional subset, as in read_hourly_stream
+    encoding : default sniffs a UTF-16 BOM, else latin-1
+
+    Returns the same schema as EPRun.hourly.
+    """
+    text_path = Path(text_path)
+    raw = text_path.read_bytes()
+    if encoding is None:
+        encoding = _sniff_encoding(raw)
+    text = raw.decode(encoding)
+
+    # 1. split off the lines above the hourly block; the rest stays one string
+    #    (sheet row n is line n, and raw frame index i is sheet row i + 2)
+    first = HEADER_ROW + 1
+    parts = text.split('\n', first + 2 + HOURLY_START)
+    h1, h2 = ([v if v.strip('\r') else None for v in parts[i].rstrip('\r').split(sep)]
+              for i in (first, first + 1))
+    names, keep = _hourly_columns(h1, h2, columns)
+
+    # 2. vectorized parse of the hourly block
+    hourly = pd.read_csv(
+        io.StringIO(parts[-1]),
+        sep=sep,
+        header=None,
+        names=range(len(names)),
+        usecols=keep,
+        decimal=decimal,
+        engine="c",
+    )
+    hourly.columns = [names[j] for j in keep]
+    hourly.index = pd.RangeIndex(HOURLY_START, HOURLY_START + len(hourly))
+
+    # 3. anything non-numeric -> NaN (only where the C parser left text)
+    obj_cols = [c for c in hourly.columns if not pd.api.types.is_numeric_dtype(hourly[c])]
+    if obj_cols:
+        hourly[obj_cols] = hourly[obj_cols].apply(pd.to_numeric, errors='coerce')
+
+    hourly = clean_hourly(hourly, source if source is not None else run_name(text_path))
+    return _subset(hourly, columns)
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import matplotlib as mpl
+import pandas as pd
+
+# one manifest folder per output folder, one entry per figure:
+# <folder>/.fig_manifest/<file name>.json = {key, size, mtime}
+# (separate files, so figures saved in parallel never overwrite each other's entry)
+MANIFEST_NAME = '.fig_manifest'
+
+# rcParams that do not change the saved file
+_RC_IGNORE = {'backend', 'backend_fallback', 'interactive', 'figure.max_open_warning'}
+
+
+def _hash_data(h, data):
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        names = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        h.update(repr(names).encode())
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, (list, tuple)):
+        h.update(f"[{len(data)}]".encode())
+        for d in data:
+            _hash_data(h, d)
+    else:
+        h.update(repr(data).encode())
+
+
+def figure_key(data, args):
+    """
+    Hash of a figure's input data (frame or list of frames), its
+    arguments and the current matplotlib rcParams (fig_setup).
+    """
+    h = hashlib.sha256()
+    _hash_data(h, data)
+    h.update(json.dumps(args, sort_keys=True, default=repr).encode())
+    rc = {k: v for k, v in mpl.rcParams.items() if k not in _RC_IGNORE}
+    h.update(json.dumps(rc, sort_keys=True, default=repr).encode())
+    return h.hexdigest()
+
+
+def _entry_path(savepath):
+    savepath = Path(savepath)
+    return savepath.parent / MANIFEST_NAME / f"{savepath.name}.json"
+
+
+def _load(savepath):
+    try:
+        with open(_entry_path(savepath), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_current(savepath, key):
+    """True if savepath exists and was written by this cache for the same key (and not touched since)."""
+    savepath = Path(savepath)
+    entry = _load(savepath)
+    if entry is None or entry['key'] != key or not savepath.exists():
+        return False
+    st = savepath.stat()
+    return (entry['size'], entry['mtime']) == (st.st_size, st.st_mtime_ns)
+
+
+def record(savepath, key):
+    """Store the key of a freshly saved figure in its folder's manifest."""
+    savepath = Path(savepath)
+    st = savepath.stat()
+    entry = {'key': key, 'size': st.st_size, 'mtime': st.st_mtime_ns}
+
+    path = _entry_path(savepath)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
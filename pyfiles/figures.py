@@ -0,0 +1,249 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import matplotlib.pyplot as plt
+import pandas as pd
+
+import pyfiles.build_frames as build_frames
+import pyfiles.capacity as capacity
+import pyfiles.capture as capture
+import pyfiles.descriptive_func as descriptive_func
+import pyfiles.fig_cache as fig_cache
+import pyfiles.overview_fig as overview_fig
+import pyfiles.profiling as profiling
+import pyfiles.var_groups as var_groups
+from pyfiles.panel import ScenarioPanel
+
+FIG_DIR = Path('0_figs')
+
+RASTER = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".webp"}
+
+# paper styling, as set up at the top of notebooks 3 and 4
+COLORS = [
+    "#4C72B0",  # blue
+    "#55A868",  # green
+    "#C44E52",  # red-ish
+    "#8172B3",  # purple
+    "#CCB974",  # ochre
+    "#64B5CD",  # light blue
+    "#8C8C8C",  # grey
+    "#E17C05",  # orange
+    "#76B7B2",  # teal
+    "#F1CE63",  # yellow
+]
+
+SOURCE_LABELS = {Path(fname).stem: nice for fname, nice in var_groups.all_cases_dict.items()}
+
+# Figure specs are plain dicts:
+#
+#   {'name': 'fig1', 'kind': 'months_grid', 'runs': var_groups.refs,
+#    'formats': ('pdf',), 'options': {...}}
+#
+#   name      : file stem in out_dir ('hourly' adds '_<variable>')
+#   kind      : key of RENDERERS
+#   runs      : workbooks in 0_EP_runs
+#   formats   : file types to write (default pdf)
+#   options   : passed to the plotting function (plots, case_labels, colors, ...)
+#   techs     : capture_rates technologies (default var_groups.electr)
+#   variables : capacity_factors technologies (default var_groups.VE_electr)
+#   scale     : capacity_factors unit factor (1000 for storages in GW)
+#
+# FIGURES reproduces the paper figures with the arguments the notebooks
+# pass for the same file (3_time_series_output: fig1-2,
+# 4_descriptive_analysis: fig3-4; checked by tests/test_figures.py).
+FIGURES = [
+    {'name': 'fig1', 'kind': 'months_grid', 'runs': 'refs',
+     'options': {'plots': var_groups.core_vars, 'case_labels': SOURCE_LABELS,
+                 'tech_labels': var_groups.tech_labels, 'colors': COLORS, 'nrows': 3, 'ncols': 3}},
+    {'name': 'fig2', 'kind': 'months_grid', 'runs': 'shock',
+     'options': {'plots': var_groups.core_vars, 'case_labels': SOURCE_LABELS,
+                 'tech_labels': var_groups.tech_labels, 'colors': COLORS, 'nrows': 3, 'ncols': 3}},
+    {'name': 'fig3', 'kind': 'capture_rates', 'runs': 'shock_descrip', 'techs': var_groups.electr,
+     'options': {'tech_labels': var_groups.tech_labels, 'source_labels': SOURCE_LABELS, 'colors': COLORS,
+                 'title': '', 'rotate': False}},
+    {'name': 'fig4', 'kind': 'capacity_factors', 'runs': 'shock_descrip', 'variables': var_groups.storages,
+     'scale': 1000,
+     'options': {'tech_labels': var_groups.tech_labels, 'source_labels': SOURCE_LABELS, 'colors': COLORS,
+                 'axline': False, 'title': ' ', 'rotate': False}},
+]
+
+
+# -------------------------------------------------------------------------------
+# renderers: spec -> data -> list of (figure, file stem)
+# -------------------------------------------------------------------------------
+
+def _runs(spec):
+    """Run list of a spec; a string names a list in var_groups."""
+    runs = spec['runs']
+    return getattr(var_groups, runs) if isinstance(runs, str) else list(runs)
+
+
+def _options(spec):
+    opts = {'tech_labels': var_groups.tech_labels, 'plots': var_groups.core_vars}
+    opts.update(spec.get('options', {}))
+    return opts
+
+
+def _hourly_frames(spec):
+    """Cached hourly frames (0_EP_runs/.cache): repeated rebuilds skip the workbooks."""
+    return [build_frames.timeseries_hourly(f) for f in _runs(spec)]
+
+
+def _monthly_frames(spec):
+    return [build_frames.timeseries_months(f) for f in _runs(spec)]
+
+
+def _hourly_columns(spec, dfs):
+    """Variables plot_metrics draws: the requested ones present in every frame."""
+    return [c for c in _options(spec)['plots'] if all(c in d.columns for d in dfs)]
+
+
+def _months_grid(spec, dfs):
+    fig, _ = overview_fig.plot_metrics_months_grid(dfs, show=False, **_options(spec))
+    return [(fig, spec['name'])] if fig is not None else []
+
+
+def _hourly(spec, dfs):
+    figs = build_frames.plot_metrics(dfs, **_options(spec)) or []
+    return [(fig, stem) for (fig, _), stem in zip(figs, _stems(spec, dfs))]
+
+
+def _bars(spec, table):
+    """plot_capture_full of a (source x tech) table, labels from the spec options."""
+    opts = dict(spec.get('options', {}))
+    tech_labels = opts.pop('tech_labels', var_groups.tech_labels)
+    fig, _ = descriptive_func.plot_capture_full(
+        table.rename(columns=tech_labels), plot_two=False, show=False, **opts
+    )
+    return [(fig, spec['name'])]
+
+
+def _capture_table(spec):
+    techs = spec.get('techs', var_groups.electr)
+    return capture.capture_rates(_hourly_frames(spec), techs=techs)
+
+
+def _capacity_table(spec):
+    variables = spec.get('variables', var_groups.VE_electr)
+    panel = ScenarioPanel.from_frames(_hourly_frames(spec), variables=variables)
+    return capacity.capacity_factors(panel, variables, scale=spec.get('scale', 1.0))
+
+
+# kind -> (load data, draw figures from the data)
+RENDERERS = {
+    'months_grid':      (_monthly_frames, _months_grid),
+    'hourly':           (_hourly_frames,  _hourly),
+    'capture_rates':    (_capture_table,  _bars),
+    'capacity_factors': (_capacity_table, _bars),
+}
+
+
+def _stems(spec, data):
+    """File stems a spec writes ('hourly': one per drawn variable)."""
+    if spec['kind'] == 'hourly':
+        return [build_frames._metric_path(spec['name'], c).stem for c in _hourly_columns(spec, data)]
+    return [spec['name']]
+
+
+# -------------------------------------------------------------------------------
+# rendering
+# -------------------------------------------------------------------------------
+
+def _init_worker():
+    """Headless backend + paper rcParams in every worker."""
+    plt.switch_backend("Agg")
+    import pyfiles.fig_setup  # noqa: F401  (sets rcParams on import)
+
+
+def _render(spec, out_dir, dpi, cache):
+    """render(); also returns whether the files were up to date."""
+    if spec['kind'] not in RENDERERS:
+        raise ValueError(f"Unknown figure kind: {spec['kind']!r} (expected one of {list(RENDERERS)})")
+    load, draw = RENDERERS[spec['kind']]
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    formats = [fmt.lstrip('.') for fmt in spec.get('formats', ('pdf',))]
+
+    data = load(spec)
+    key = None
+    if cache:
+        key = fig_cache.figure_key(data, dict(spec=spec, dpi=dpi))
+        paths = [out_dir / f"{stem}.{fmt}" for stem in _stems(spec, data) for fmt in formats]
+        if paths and all(fig_cache.is_current(p, key) for p in paths):
+            return paths, True
+
+    paths = []
+    try:
+        for fig, stem in draw(spec, data):
+            for fmt in formats:
+                path = out_dir / f"{stem}.{fmt}"
+                skw = dict(bbox_inches="tight")
+                if path.suffix.lower() in RASTER:
+                    skw["dpi"] = dpi
+                with profiling.stage('savefig') as rec:
+                    fig.savefig(path, **skw)
+                    rec['bytes'] = path.stat().st_size
+                if key is not None:
+                    fig_cache.record(path, key)
+                paths.append(path)
+            plt.close(fig)
+    finally:
+        plt.close('all')
+    return paths, False
+
+
+def render(spec, out_dir=FIG_DIR, dpi=300, cache=True):
+    """
+    Render one spec and write its files. Every figure is closed before
+    returning, also on errors. Returns the list of written paths.
+
+    With cache=True the spec's data is loaded and keyed with fig_cache
+    (data, spec, dpi and rcParams); if every file of the spec is up to
+    date nothing is drawn and their paths are returned.
+    """
+    return _render(spec, out_dir, dpi, cache)[0]
+
+
+def _render_timed(spec, out_dir, dpi, cache):
+    t0 = time.perf_counter()
+    try:
+        paths, cached = _render(spec, out_dir, dpi, cache)
+        error = None
+    except Exception as e:
+        paths, cached, error = [], False, f"{type(e).__name__}: {e}"
+    return paths, cached, error, time.perf_counter() - t0
+
+
+def render_all(specs=None, out_dir=FIG_DIR, workers=None, dpi=300, cache=True):
+    """
+    Render many figure specs (default: FIGURES) headless across a process pool.
+
+    workers : number of processes (default: all cores; 1 = in this process,
+              switching it to the Agg backend)
+    cache   : skip specs whose files are up to date (see render)
+
+    Returns a DataFrame with name, files, cached, seconds and error per
+    spec. A failing spec does not stop the others.
+    """
+    specs = list(FIGURES if specs is None else specs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(specs)))
+
+    args = (specs, [out_dir] * len(specs), [dpi] * len(specs), [cache] * len(specs))
+    if workers == 1:
+        _init_worker()
+        results = list(map(_render_timed, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(_render_timed, *args))
+
+    return pd.DataFrame(
+        [
+            {'name': s['name'], 'files': [str(p) for p in paths], 'cached': cached,
+             'seconds': round(sec, 2), 'error': err}
+            for s, (paths, cached, err, sec) in zip(specs, results)
+        ]
+    )
@@ -3,10 +3,13 @@ import numpy as np
 import matplotlib.pyplot as plt
 import itertools
 
+import pyfiles.fig_cache as fig_cache
 import pyfiles.fig_setup as fig_setup
+import pyfiles.profiling as profiling
 
 from pathlib import Path
 
+@profiling.profiled(sizes=False)
 def plot_metrics_months_grid(
     dfs,
     plots=None,
@@ -20,6 +23,7 @@ def plot_metrics_months_grid(
     save_kwargs=None,       # <- NEW: extra kwargs for fig.savefig
     show=True,              # <- NEW
     close=False,            # <- NEW: close figure after saving/showing
+    cache=False,            # skip re-rendering/saving when savepath is up to date
 ):
     """
     Multi-panel monthly plot:
@@ -29,11 +33,26 @@ def plot_metrics_months_grid(
 
     Saving:
     - pass savepath="path/filename.png" or ".pdf"
+    - opt-in cache=True: the file is keyed on the data, the arguments and the
+      rcParams (fig_cache); if it is up to date nothing is saved, and with
+      show=False nothing is rendered either (returns None, None)
     """
 
     if dfs is None or len(dfs) == 0:
         raise ValueError("`dfs` must be a non-empty list of DataFrames.")
 
+    # --- 0. figure cache ---
+    fig_key = up_to_date = None
+    if savepath is not None and cache:
+        fig_key = fig_cache.figure_key(dfs, dict(
+            plots=plots, case_labels=case_labels, tech_labels=tech_labels, colors=colors,
+            nrows=nrows, ncols=ncols, dpi=dpi, save_kwargs=save_kwargs,
+        ))
+        up_to_date = fig_cache.is_current(savepath, fig_key)
+        if up_to_date and not show:
+            print(f"Up to date, not re-rendered: {savepath}")
+            return None, None
+
     # --- 1. default variables to plot ---
     if plots is None:
         plots = [
@@ -192,7 +211,7 @@ def plot_metrics_months_grid(
     plt.tight_layout(rect=(0, 0.04, 1, 1))
 
     # --- 9. SAVE (optional) ---
-    if savepath is not None:
+    if savepath is not None and not up_to_date:
         savepath = Path(savepath)
         savepath.parent.mkdir(parents=True, exist_ok=True)
 
@@ -202,7 +221,11 @@ def plot_metrics_months_grid(
         if save_kwargs:
             skw.update(save_kwargs)
 
-        fig.savefig(savepath, **skw)
+        with profiling.stage('savefig') as rec:
+            fig.savefig(savepath, **skw)
+            rec['bytes'] = savepath.stat().st_size
+        if fig_key is not None:
+            fig_cache.record(savepath, fig_key)
 
     # --- 10. SHOW / CLOSE ---
     if show:
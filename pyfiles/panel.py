@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+# columns of the hourly frames that are not variables
+ID_COLS = ['hour', 'source', 'd_summer']
+
+
+def summer_mask(hour):
+    """Same summer definition as the hourly readers (hours 3649-5856)."""
+    hour = np.asarray(hour)
+    return (hour >= 3649) & (hour < 5857)
+
+
+class ScenarioPanel:
+    """
+    Hourly output of many scenarios in one contiguous
+    (scenario x hour x variable) float array.
+
+    - values    : ndarray, shape (n_scenarios, n_hours, n_variables)
+    - scenarios : categorical scenario labels (file stems), in panel order
+    - variables : Index of variable names
+    - hour      : hour numbers shared by all scenarios
+    - d_summer  : boolean summer mask over `hour`
+
+    Missing variables / hours of a scenario are NaN and are ignored by
+    the reductions (like groupby().sum()).
+    """
+
+    def __init__(self, values, scenarios, variables, hour):
+        self.values = values
+        self.scenarios = pd.Categorical(scenarios, categories=list(dict.fromkeys(scenarios)))
+        self.variables = pd.Index(variables)
+        self.hour = np.asarray(hour)
+        self.d_summer = summer_mask(self.hour)
+
+        if values.shape != (len(self.scenarios), len(self.hour), len(self.variables)):
+            raise ValueError(f"values has shape {values.shape}, expected "
+                             f"{(len(self.scenarios), len(self.hour), len(self.variables))}")
+
+    def __repr__(self):
+        s, h, v = self.values.shape
+        return f"ScenarioPanel({s} scenarios x {h} hours x {v} variables, {self.values.nbytes / 1e6:.1f} MB)"
+
+    # ------------------------------------------------------------------
+    # construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_frames(cls, dfs, variables=None, dtype=np.float64):
+        """
+        Build a panel from hourly frames (one per scenario, as returned
+        by build_frames.timeseries_hourly).
+
+        variables : columns to keep (default: every non-id column, in order of appearance)
+        """
+        dfs = list(dfs)
+        if not dfs:
+            raise ValueError("`dfs` must be a non-empty list of DataFrames.")
+
+        if variables is None:
+            variables = list(dict.fromkeys(
+                c for d in dfs for c in d.columns if c not in ID_COLS
+            ))
+        variables = pd.Index(variables)
+
+        scenarios = [
+            str(d["source"].iloc[0]) if "source" in d.columns else f"case_{i}"
+            for i, d in enumerate(dfs)
+        ]
+
+        # common hour axis: every hour of any frame, in order; rows are
+        # placed by their hour, not their position (frames may have gaps)
+        hours = [
+            d["hour"].to_numpy() if "hour" in d.columns else np.arange(1, len(d) + 1)
+            for d in dfs
+        ]
+        hour = np.unique(np.concatenate(hours))
+        hour_index = pd.Index(hour)
+
+        values = np.full((len(dfs), len(hour), len(variables)), np.nan, dtype=dtype)
+        for s, (d, h) in enumerate(zip(dfs, hours)):
+            if pd.Index(h).has_duplicates:
+                raise ValueError(f"Frame {scenarios[s]!r} has duplicated hours")
+            cols = [c for c in variables if c in d.columns]
+            if cols:
+                rows = hour_index.get_indexer(h)
+                values[s, rows[:, None], variables.get_indexer(cols)] = d[cols].to_numpy(dtype=dtype)
+
+        return cls(values, scenarios, variables, hour)
+
+    @classmethod
+    def from_long(cls, df, variables=None, dtype=np.float64):
+        """Build a panel from a concatenated long frame (e.g. all_h)."""
+        frames = [g for _, g in df.groupby("source", sort=False, observed=True)]
+        return cls.from_frames(frames, variables=variables, dtype=dtype)
+
+    def select(self, variables):
+        """New panel holding only `variables`."""
+        idx = self.variables.get_indexer(variables)
+        if (idx < 0).any():
+            missing = [v for v, i in zip(variables, idx) if i < 0]
+            raise KeyError(f"Variables not in panel: {missing}")
+        return ScenarioPanel(self.values[:, :, idx], list(self.scenarios), list(variables), self.hour)
+
+    def to_long(self):
+        """Back to the long format of pd.concat(dfs) (hour, source, d_summer, variables...)."""
+        s, h, v = self.values.shape
+        out = pd.DataFrame(self.values.reshape(s * h, v), columns=self.variables)
+        out.insert(0, "hour", np.tile(self.hour, s))
+        out.insert(1, "source", np.repeat(np.asarray(self.scenarios), h))
+        out.insert(2, "d_summer", np.tile(self.d_summer, s))
+        return out
+
+    # ------------------------------------------------------------------
+    # reductions
+    # ------------------------------------------------------------------
+
+    def _idx(self, variables):
+        if variables is None:
+            return slice(None), self.variables
+        variables = pd.Index(variables)
+        return self.variables.get_indexer(variables), variables
+
+    @property
+    def index(self):
+        return pd.Index(np.asarray(self.scenarios), name="source")
+
+    @property
+    def season_index(self):
+        return pd.MultiIndex.from_product([self.index, [False, True]], names=["source", "d_summer"])
+
+    def var(self, name):
+        """(scenario x hour) array of one variable."""
+        return self.values[:, :, self.variables.get_loc(name)]
+
+    def tech_sum(self, variables):
+        """(scenario x hour) sum over a group of variables (e.g. agg_prod over var_groups.electr)."""
+        idx, _ = self._idx(variables)
+        return np.nansum(self.values[:, :, idx], axis=2)
+
+    def annual_sum(self, variables=None):
+        """Annual totals, DataFrame (source x variable)."""
+        idx, cols = self._idx(variables)
+        return pd.DataFrame(np.nansum(self.values[:, :, idx], axis=1), index=self.index, columns=cols)
+
+    def seasonal_sum(self, variables=None):
+        """Summer / non-summer totals, DataFrame indexed by (source, d_summer)."""
+        idx, cols = self._idx(variables)
+        sub = self.values[:, :, idx]
+        out = np.stack([
+            np.nansum(sub[:, ~self.d_summer], axis=1),
+            np.nansum(sub[:, self.d_summer], axis=1),
+        ], axis=1)                                     # (scenario, season, variable)
+        return pd.DataFrame(out.reshape(-1, len(cols)), index=self.season_index, columns=cols)
+
+    def hours_by_season(self):
+        """Number of hours per (source, d_summer), like groupby(...)['hour'].nunique()."""
+        n_summer = int(self.d_summer.sum())
+        counts = np.tile([len(self.hour) - n_summer, n_summer], len(self.scenarios))
+        return pd.Series(counts, index=self.season_index, name="hour")
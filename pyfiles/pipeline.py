@@ -0,0 +1,396 @@
+"""
+Dependency-aware replacement for 0_run_all.ipynb.
+
+Stages are plain functions with declared inputs (files), outputs (file
+patterns), parameters and code modules. A stage reruns only when the
+hash of those changed or an output is missing; stages whose upstream
+stages are done run in parallel.
+
+    python -m pyfiles.pipeline                 # everything that is out of date
+    python -m pyfiles.pipeline figures         # one stage (+ out-of-date upstream)
+    python -m pyfiles.pipeline --dry-run       # show what would run
+    python -m pyfiles.pipeline --force metrics # rerun regardless of hashes
+    python -m pyfiles.pipeline --config cfg.json --workers 3
+    python -m pyfiles.pipeline --profile       # timing reports in 0_cache/profile
+"""
+import argparse
+import glob
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+STATE_PATH = Path('0_cache') / 'pipeline.json'
+METRICS_DIR = Path('0_cache') / 'metrics'
+
+
+# -------------------------------------------------------------------------------
+# 1. stage functions (module level, so they can run in worker processes)
+# -------------------------------------------------------------------------------
+
+def fetch_distributions(params):
+    """Variation patterns and spot prices from Energi Data Service -> EnergyPLAN distribution files."""
+    import pyfiles.build_vp as build_vp
+
+    _, shares = build_vp.build_variation_patterns(
+        start=params['start'], end=params['end'], save=True,
+        stat=params.get('stat', 'mean'), out_dir=params.get('out_dir'),
+    )
+    build_vp.build_price_pattern(
+        start=params['start'], end=params['end'], save=True,
+        shares=shares.loc['Electricity_Demand'], out_dir=params.get('out_dir'),
+    )
+
+
+def distribution_files(params):
+    """The files fetch_distributions writes (1_get_input_v2: four patterns + spot prices)."""
+    import pyfiles.build_vp as build_vp
+    import pyfiles.distributions as distributions
+
+    _, _, year_label = build_vp.time_inputs(params['start'], params['end'])
+    names = list(build_vp.DISTRIBUTIONS) + [build_vp.PRICE_DISTRIBUTION]
+    return [distributions.distribution_path(n, year_label, params.get('out_dir')) for n in names]
+
+
+def build_scenarios(params):
+    """
+    Scenario file(s) from the reference file: one file via build_params,
+    or a whole sweep (sweep.full_factorial over params['levels']).
+    """
+    from pyfiles.scenario_functions import ScenarioTemplate, build_params
+    import pyfiles.sweep as sweep
+
+    template = ScenarioTemplate(params['template'])
+    args = (params['case'], params.get('base_params', {}),
+            params.get('base_case_params', {}), params.get('shock_case_params', {}))
+
+    if 'levels' in params:
+        runs = sweep.iter_params(sweep.full_factorial(params['levels']), *args)
+        sweep.write_sweep(runs, template, params['out_dir'])
+    else:
+        template.write(params['out_path'], build_params(*args))
+
+
+def load_runs(params):
+    """Parse every workbook once: run_cache entries + run catalogue."""
+    import pyfiles.batch_load as batch_load
+    from pyfiles.catalogue import Catalogue
+    from pyfiles.ep_run import RUN_DIR
+
+    with Catalogue() as cat:
+        cat.scan()
+    files = sorted(p.name for p in RUN_DIR.glob('*.xlsx') if not p.name.startswith('~$'))
+    batch_load.warm_runs(files, workers=params.get('workers'), errors='skip')
+
+
+def compute_metrics(params):
+    """Capture rates, capacity factors and costs per run group -> 0_cache/metrics/*.csv."""
+    import pyfiles.build_frames as build_frames
+    import pyfiles.capacity as capacity
+    import pyfiles.capture as capture
+    import pyfiles.costs as costs
+    import pyfiles.var_groups as var_groups
+    from pyfiles.panel import ScenarioPanel
+
+    out = Path(params.get('out_dir', METRICS_DIR))
+    out.mkdir(parents=True, exist_ok=True)
+
+    for group in params.get('groups', ['shock_descrip']):
+        files = getattr(var_groups, group)
+        panel = ScenarioPanel.from_frames([build_frames.timeseries_hourly(f) for f in files])
+        techs = [t for t in var_groups.electr if t in panel.variables]
+        ve = [t for t in var_groups.VE_electr if t in panel.variables]
+
+        capture.capture_rates(panel, techs=techs).to_csv(out / f"{group}_capture_rates.csv")
+        capture.capture_rates(panel, techs=techs, seasonal=True).to_csv(
+            out / f"{group}_capture_rates_seasonal.csv")
+        capacity.capacity_factors(panel, ve).to_csv(out / f"{group}_capacity_factors.csv")
+        costs.cost_matrix(files).to_csv(out / f"{group}_costs.csv")
+
+
+def render_figures(params):
+    """Paper figures (figures.FIGURES) -> 0_figs/."""
+    import pyfiles.figures as figures
+
+    report = figures.render_all(out_dir=params.get('out_dir', figures.FIG_DIR),
+                                workers=params.get('workers'))
+    failed = report[report['error'].notna()]
+    if len(failed):
+        raise RuntimeError("figures failed:\n" + failed[['name', 'error']].to_string(index=False))
+
+
+# -------------------------------------------------------------------------------
+# 2. stage declarations
+# -------------------------------------------------------------------------------
+
+class Stage:
+    """
+    One pipeline step.
+
+    func    : stage function, called as func(params)
+    deps    : stages that must finish first
+    inputs  : files / glob patterns whose content is hashed
+    outputs : glob patterns that must exist for the stage to count as done
+    code    : pyfiles modules whose source is hashed
+    params  : json-able parameters (hashed); None = stage not configured
+    """
+
+    def __init__(self, name, func, deps=(), inputs=(), outputs=(), code=(), params=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.params = params
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={self.deps})"
+
+    def files(self, patterns):
+        return sorted({p for pat in patterns for p in glob.glob(str(pat))})
+
+    def key(self, hashes):
+        """Hash of params, code and input file contents."""
+        h = hashlib.sha256()
+        h.update(json.dumps(self.params, sort_keys=True, default=str).encode())
+        for mod in [self.func.__module__] + self.code:
+            h.update(_content_hash(importlib.import_module(mod).__file__, hashes).encode())
+        for path in self.files(self.inputs):
+            h.update(path.encode())
+            h.update(_content_hash(path, hashes).encode())
+        return h.hexdigest()
+
+    def outputs_exist(self):
+        return all(glob.glob(str(pat)) for pat in self.outputs)
+
+
+def default_stages(config=None):
+    """
+    The five stages of 0_run_all. config overrides stage params by stage
+    name; build_scenarios needs {'template', 'case', 'out_path' or
+    'levels' + 'out_dir', ...} and is skipped until configured.
+    """
+    import pyfiles.figures as figures
+    from pyfiles.ep_batch import LOG_NAME
+    from pyfiles.ep_run import ASCII_SUFFIX, RUN_DIR
+
+    config = config or {}
+    dist = {'start': '2023-01-01T00:00', 'end': '2026-01-01T00:00', **config.get('distributions', {})}
+    scen = config.get('scenarios')
+    # workbooks, text exports / ep_batch outputs and the ep_batch log
+    runs = [RUN_DIR / '*.xlsx', RUN_DIR / f'*{ASCII_SUFFIX}', RUN_DIR / LOG_NAME]
+
+    return [
+        Stage('distributions', fetch_distributions,
+              outputs=distribution_files(dist),
+              code=['pyfiles.build_vp', 'pyfiles.profiles', 'pyfiles.distributions'],
+              params=dist),
+        Stage('scenarios', build_scenarios,
+              inputs=[scen['template']] if scen else [],
+              outputs=[scen.get('out_path') or Path(scen['out_dir']) / 'manifest.csv'] if scen else [],
+              code=['pyfiles.scenario_functions', 'pyfiles.sweep'],
+              params=scen),
+        Stage('load_runs', load_runs,
+              inputs=runs,
+              outputs=['0_cache/catalogue.sqlite'],
+              code=['pyfiles.ep_run', 'pyfiles.run_cache', 'pyfiles.catalogue', 'pyfiles.costs'],
+              params=config.get('load_runs', {})),
+        Stage('metrics', compute_metrics, deps=['load_runs'],
+              inputs=runs,
+              outputs=[Path(config.get('metrics', {}).get('out_dir', METRICS_DIR)) / '*.csv'],
+              code=['pyfiles.capture', 'pyfiles.capacity', 'pyfiles.panel', 'pyfiles.var_groups',
+                    'pyfiles.costs', 'pyfiles.build_frames'],
+              params=config.get('metrics', {})),
+        Stage('figures', render_figures, deps=['load_runs'],
+              inputs=runs,
+              outputs=[Path(config.get('figures', {}).get('out_dir', figures.FIG_DIR)) / f"{s['name']}.pdf"
+                       for s in figures.FIGURES],
+              code=['pyfiles.figures', 'pyfiles.overview_fig', 'pyfiles.descriptive_func',
+                    'pyfiles.fig_setup', 'pyfiles.build_frames', 'pyfiles.capture',
+                    'pyfiles.capacity', 'pyfiles.var_groups'],
+              params=config.get('figures', {})),
+    ]
+
+
+# -------------------------------------------------------------------------------
+# 3. runner
+# -------------------------------------------------------------------------------
+
+def _content_hash(path, hashes):
+    """sha256 of a file, memoized on (size, mtime) in the state file."""
+    from pyfiles.run_cache import file_hash
+
+    st = os.stat(path)
+    entry = hashes.get(str(path))
+    if entry is not None and entry[:2] == [st.st_size, st.st_mtime_ns]:
+        return entry[2]
+    digest = file_hash(path)
+    hashes[str(path)] = [st.st_size, st.st_mtime_ns, digest]
+    return digest
+
+
+def _load_state(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'stages': {}, 'hashes': {}}
+
+
+def _save_state(state, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _run_stage(func, params):
+    t0 = time.perf_counter()
+    func(params)
+    return time.perf_counter() - t0
+
+
+def _closure(stages, targets):
+    """targets + everything they depend on."""
+    by_name = {s.name: s for s in stages}
+    todo, seen = list(targets), set()
+    while todo:
+        name = todo.pop()
+        if name not in by_name:
+            raise KeyError(f"Unknown stage: {name!r} (expected one of {list(by_name)})")
+        if name not in seen:
+            seen.add(name)
+            todo.extend(by_name[name].deps)
+    return [s for s in stages if s.name in seen]
+
+
+def run(targets=None, stages=None, config=None, force=False, workers=None, dry_run=False,
+        state_path=STATE_PATH):
+    """
+    Run the out-of-date stages (default: all) and their out-of-date upstream stages.
+
+    force   : True = rerun every selected stage; or a list of stage names
+    workers : parallel stage processes (default: number of ready stages)
+
+    Returns {stage name: status}, status in 'up to date', 'ran', 'would run',
+    'not configured', 'failed: ...', 'blocked'.
+    """
+    stages = default_stages(config) if stages is None else stages
+    if targets:
+        stages = _closure(stages, targets)
+    forced = {s.name for s in stages} if force is True else set(force or ())
+
+    state = _load_state(Path(state_path))
+    hashes = state.setdefault('hashes', {})
+    status, keys = {}, {}
+
+    pending = {s.name: s for s in stages}
+    running = {}
+
+    pool = None
+    try:
+        while pending or running:
+            ready = [s for s in pending.values() if not any(d in pending or d in running for d in s.deps)]
+            if not ready and not running:
+                raise ValueError(f"Stage dependencies form a cycle: {list(pending)}")
+
+            for s in ready:
+                del pending[s.name]
+
+                if any(status.get(d, '').startswith(('failed', 'blocked')) for d in s.deps):
+                    status[s.name] = 'blocked'
+                    continue
+                if s.params is None:
+                    status[s.name] = 'not configured'
+                    continue
+
+                # inputs of a stage can be outputs of its upstream stages -> key after they ran
+                keys[s.name] = s.key(hashes)
+                prev = state['stages'].get(s.name, {})
+                current = prev.get('key') == keys[s.name] and s.outputs_exist()
+                if current and s.name not in forced:
+                    status[s.name] = 'up to date'
+                    continue
+                if dry_run:
+                    status[s.name] = 'would run'
+                    continue
+
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=workers or len(stages))
+                print(f"[pipeline] {s.name}: running")
+                running[s.name] = pool.submit(_run_stage, s.func, s.params)
+
+            if not running:
+                continue
+
+            done, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name in [n for n, f in running.items() if f in done]:
+                fut = running.pop(name)
+                try:
+                    seconds = fut.result()
+                except Exception as e:
+                    status[name] = f"failed: {type(e).__name__}: {e}"
+                    print(f"[pipeline] {name}: {status[name]}")
+                    continue
+                status[name] = 'ran'
+                state['stages'][name] = {
+                    'key': keys[name],
+                    'seconds': round(seconds, 2),
+                    'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                }
+                print(f"[pipeline] {name}: done in {seconds:.1f} s")
+                _save_state(state, Path(state_path))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if not dry_run:
+            _save_state(state, Path(state_path))
+
+    return status
+
+
+# -------------------------------------------------------------------------------
+# 4. CLI
+# -------------------------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pyfiles.pipeline', description=__doc__.split('\n\n')[0])
+    parser.add_argument('stages', nargs='*', help='stages to bring up to date (default: all)')
+    parser.add_argument('--config', help='json file with stage params, keyed by stage name')
+    parser.add_argument('--force', action='store_true', help='rerun the selected stages regardless of hashes')
+    parser.add_argument('--workers', type=int, default=None, help='parallel stages')
+    parser.add_argument('--dry-run', action='store_true', help='only show what would run')
+    parser.add_argument('--list', action='store_true', help='list the stages and exit')
+    parser.add_argument('--profile', action='store_true', help='record timings (see pyfiles.profiling)')
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        import pyfiles.profiling as profiling
+        profiling.enable()
+
+    config = None
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config = json.load(f)
+
+    if args.list:
+        for s in default_stages(config):
+            deps = f" (after {', '.join(s.deps)})" if s.deps else ''
+            print(f"{s.name}{deps}: {s.func.__doc__.strip().splitlines()[0]}")
+        return 0
+
+    status = run(args.stages or None, config=config, force=(args.stages or True) if args.force else False,
+                 workers=args.workers, dry_run=args.dry_run)
+    for name, st in status.items():
+        print(f"{name:15s} {st}")
+    return 1 if any(st.startswith('failed') for st in status.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# typical-year layout used for EnergyPLAN distributions:
+# 8760 hours on a 365-day calendar (Feb 29 dropped) + the first day repeated
+N_BASE = 8760
+N_SLOTS = 8784
+
+# first day-of-year (0-based) of each month in a 365-day year
+_MONTH_START = np.cumsum([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+
+
+def hour_of_year(ts):
+    """
+    Integer hour-of-year slot (0..8759) of each timestamp on a 365-day
+    calendar; Feb 29 hours get -1.
+    """
+    idx = pd.DatetimeIndex(ts)
+    month = idx.month.to_numpy()
+    day = idx.day.to_numpy()
+    slot = (_MONTH_START[month - 1] + day - 1) * 24 + idx.hour.to_numpy()
+    slot[(month == 2) & (day == 29)] = -1
+    return slot
+
+
+def _slot_quantile(slot, values, q, out):
+    """Per-slot linear-interpolated quantile (as np.quantile), fully vectorized."""
+    order = np.lexsort((values, slot))
+    slot, values = slot[order], values[order]
+
+    counts = np.bincount(slot, minlength=N_BASE)
+    starts = np.cumsum(counts) - counts
+    has = counts > 0
+
+    pos = starts[has] + q * (counts[has] - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.ceil(pos).astype(int)
+    out[:N_BASE][has] = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def typical_year(values, ts, stat="mean"):
+    """
+    Typical-year profile of an hourly series spanning one or more years.
+
+    values : hourly values
+    ts     : their timestamps
+    stat   : 'mean', 'median' or a quantile in [0, 1]
+
+    Returns a float array of 8784 slots: 8760 hour-of-year averages
+    (Feb 29 ignored, NaN where no data) followed by the first 24 hours
+    again, the layout build_variation_pattern writes for EnergyPLAN.
+    """
+    values = np.asarray(values, dtype=float)
+    slot = hour_of_year(ts)
+
+    valid = (slot >= 0) & ~np.isnan(values)
+    slot, values = slot[valid], values[valid]
+
+    out = np.full(N_SLOTS, np.nan)
+
+    if stat == "mean":
+        sums = np.bincount(slot, weights=values, minlength=N_BASE)
+        counts = np.bincount(slot, minlength=N_BASE)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:N_BASE] = np.where(counts > 0, sums / counts, np.nan)
+    else:
+        q = 0.5 if stat == "median" else float(stat)
+        if not 0 <= q <= 1:
+            raise ValueError(f"Unknown stat: {stat!r}")
+        _slot_quantile(slot, values, q, out)
+
+    # extra day
+    out[N_BASE:] = out[:N_SLOTS - N_BASE]
+    return out
@@ -0,0 +1,272 @@
+import atexit
+import functools
+import json
+import multiprocessing.util
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Timing / memory instrumentation of the pyfiles functions.
+#
+# Off by default. Turn on with the environment variable EP_PROFILE=1 or
+# profiling.enable() before the work starts. While off, a @profiled
+# function costs one flag check and stage() one no-op context; while on,
+# functions with sizes=True also measure the data they return.
+#
+# Pool workers: forked workers inherit the on/off state and start with
+# no records; spawned workers (Windows, macOS) are fresh interpreters
+# and only record if EP_PROFILE=1 is in their environment, which
+# enable() sets, so call it before the pool is created.
+#
+# Every process that recorded something writes its report to
+# PROFILE_DIR/<time>_<pid>.json when it exits; records() / summary()
+# give the same data as frames during a session.
+
+PROFILE_DIR = Path('0_cache') / 'profile'
+
+ENV_VAR = 'EP_PROFILE'
+
+COLUMNS = ['name', 'parent', 'depth', 'pid', 'start', 'seconds', 'peak_rss_delta_mb', 'rows', 'bytes', 'error']
+
+_enabled = os.environ.get(ENV_VAR, "") == "1"
+_records = []
+_local = threading.local()
+_hooked = False      # exit hooks registered in this process
+_written = False     # report of this process written
+
+try:
+    import resource
+
+    # ru_maxrss: kB on Linux, bytes on macOS
+    _RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+    def _peak_rss():
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+except ImportError:  # Windows
+    try:
+        import psutil
+
+        def _peak_rss():
+            info = psutil.Process().memory_info()
+            return getattr(info, 'peak_wset', info.rss)
+    except ImportError:
+        def _peak_rss():
+            return None
+
+
+def enable():
+    """Start recording (in this process and in workers started afterwards)."""
+    global _enabled
+    _enabled = True
+    os.environ[ENV_VAR] = "1"
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    os.environ.pop(ENV_VAR, None)
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    """Drop all records of this process."""
+    _records.clear()
+
+
+# -------------------------------------------------------------------------------
+# recording
+# -------------------------------------------------------------------------------
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def size_of(obj):
+    """
+    (rows, bytes) of a frame, series, array or a list/tuple/dict of them;
+    None for anything else. Bytes are the shallow memory_usage (object
+    columns count their pointers only).
+    """
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), int(obj.memory_usage(index=True, deep=False).sum())
+    if isinstance(obj, pd.Series):
+        return len(obj), int(obj.memory_usage(index=True, deep=False))
+    if isinstance(obj, np.ndarray):
+        return (obj.shape[0] if obj.ndim else 1), int(obj.nbytes)
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (list, tuple)):
+        sizes = [s for s in map(size_of, obj) if s is not None]
+        if sizes:
+            return sum(r for r, _ in sizes), sum(b for _, b in sizes)
+    return None
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a block. Yields the record dict; the block may set
+    rec['rows'] / rec['bytes'] itself (it gets a throwaway dict while off).
+
+        with profiling.stage('read_excel') as rec:
+            df = pd.read_excel(path)
+            rec['rows'] = len(df)
+    """
+    if not _enabled:
+        yield {}
+        return
+
+    stack = _stack()
+    rec = {
+        'name': name,
+        'parent': stack[-1]['name'] if stack else None,
+        'depth': len(stack),
+        'pid': os.getpid(),
+        'start': time.time(),
+        'rows': None,
+        'bytes': None,
+        'error': None,
+    }
+    stack.append(rec)
+    rss0 = _peak_rss()
+    t0 = time.perf_counter()
+    try:
+        yield rec
+    except BaseException as e:
+        rec['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        rec['seconds'] = time.perf_counter() - t0
+        # growth of the process' peak RSS during the block (0 if it stayed below an earlier peak)
+        rec['peak_rss_delta_mb'] = None if rss0 is None else (_peak_rss() - rss0) / 2**20
+        stack.pop()
+        _records.append(rec)
+        if not _hooked:
+            _hook_exit()
+
+
+def profiled(func=None, *, name=None, sizes=True):
+    """
+    Decorator recording each call of func as a stage named
+    '<module>.<function>'. With sizes=True rows / bytes are those of the
+    returned data (size_of); use sizes=False for functions returning
+    figures, which then only get timed.
+    """
+    if func is None:
+        return functools.partial(profiled, name=name, sizes=sizes)
+    label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        with stage(label) as rec:
+            result = func(*args, **kwargs)
+            if sizes:
+                size = size_of(result)
+                if size is not None:
+                    rec['rows'], rec['bytes'] = size
+        return result
+
+    return wrapper
+
+
+# -------------------------------------------------------------------------------
+# reports
+# -------------------------------------------------------------------------------
+
+def records():
+    """All records of this process, in completion order."""
+    return pd.DataFrame(_records, columns=COLUMNS)
+
+
+def summary(df=None):
+    """Per stage: calls, total / mean / max seconds, max peak-RSS growth, rows, bytes and errors."""
+    df = records() if df is None else df
+    out = df.groupby('name').agg(
+        calls=('seconds', 'size'),
+        total_s=('seconds', 'sum'),
+        mean_s=('seconds', 'mean'),
+        max_s=('seconds', 'max'),
+        peak_rss_delta_mb=('peak_rss_delta_mb', 'max'),
+        rows=('rows', 'sum'),
+        bytes=('bytes', 'sum'),
+        errors=('error', 'count'),
+    )
+    return out.sort_values('total_s', ascending=False)
+
+
+def write_report(path=None, df=None):
+    """
+    Write the records to path (.csv or .json, default
+    PROFILE_DIR/<time>_<pid>.json). Returns the path.
+    """
+    df = records() if df is None else df
+    if path is None:
+        path = PROFILE_DIR / f"{datetime.now():%Y%m%d-%H%M%S}_{os.getpid()}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == '.csv':
+        df.to_csv(path, index=False)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(json.loads(df.to_json(orient='records')), f, indent=1)
+    return path
+
+
+def read_reports(folder=PROFILE_DIR):
+    """All JSON / CSV reports in folder as one frame (e.g. main process + pool workers)."""
+    frames = []
+    for p in sorted(Path(folder).glob('*')):
+        if p.suffix == '.json':
+            frames.append(pd.read_json(p, orient='records'))
+        elif p.suffix == '.csv':
+            frames.append(pd.read_csv(p))
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _write_at_exit():
+    global _written
+    if _written or not _enabled or not _records:
+        return
+    _written = True
+    write_report()
+
+
+def _hook_exit():
+    """
+    Write this process' report when it exits, registered once per process
+    on its first record: atexit for a normal interpreter exit, and a
+    multiprocessing finalizer for pool workers, which end with os._exit
+    (skipping atexit) and drop inherited finalizers on start.
+    """
+    global _hooked
+    _hooked = True
+    atexit.register(_write_at_exit)
+    multiprocessing.util.Finalize(None, _write_at_exit, exitpriority=0)
+
+
+def _after_fork():
+    # a forked child starts its own report: no parent records, stack or hooks
+    global _local, _hooked, _written
+    _records.clear()
+    _local = threading.local()
+    _hooked = _written = False
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
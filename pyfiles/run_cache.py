@@ -0,0 +1,105 @@
+import hashlib
+import os
+from pathlib import Path
+import pandas as pd
+
+from pyfiles.ep_run import RUN_DIR, open_run, text_sibling
+
+# cleaned frames are stored here, one file per (run, block)
+CACHE_DIR = RUN_DIR / '.cache'
+
+# bump whenever the cleaning in ep_run changes -> all entries are rebuilt
+LOADER_VERSION = 1
+
+# blocks of an EPRun that can be cached
+KINDS = ('hourly', 'monthly')
+
+try:
+    import pyarrow  # noqa: F401
+    _SUFFIX = '.parquet'
+except ImportError:
+    _SUFFIX = '.pkl'
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha256 of a file's content."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write(df, path):
+    # per-process tmp name: parallel loaders may build the same entry at once
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    if path.suffix == '.parquet':
+        df.to_parquet(tmp)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _read(path):
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def cache_path(excel_path, kind, sheet_name=0, digest=None):
+    """Cache file for one block of one run, keyed by content hash and loader version."""
+    if digest is None:
+        digest = file_hash(RUN_DIR / excel_path)
+        text_path = text_sibling(excel_path)
+        if kind == 'hourly' and text_path is not None:
+            digest = hashlib.sha256((digest + file_hash(text_path)).encode()).hexdigest()
+    stem = Path(excel_path).stem
+    return CACHE_DIR / f"{stem}.{kind}.s{sheet_name}.v{LOADER_VERSION}.{digest[:16]}{_SUFFIX}"
+
+
+def load_block(excel_path, kind, sheet_name=0):
+    """
+    Return the cleaned `kind` block ('hourly' or 'monthly') of excel_path.
+
+    A hit is read straight from CACHE_DIR without touching openpyxl.
+    On a miss (new file, changed content or new LOADER_VERSION) the
+    workbook is parsed, the entry is written and stale entries for the
+    same run and block are removed.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind!r} (expected one of {KINDS})")
+
+    path = cache_path(excel_path, kind, sheet_name=sheet_name)
+    if path.exists():
+        try:
+            return _read(path)
+        except Exception as e:
+            print(f"Warning: unreadable cache entry {path.name} will be rebuilt ({e})")
+
+    df = getattr(open_run(excel_path, sheet_name=sheet_name), kind).copy()
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for old in CACHE_DIR.glob(f"{Path(excel_path).stem}.{kind}.s{sheet_name}.*"):
+        if old != path and old.suffix != '.tmp':
+            old.unlink(missing_ok=True)
+    _write(df, path)
+
+    return df
+
+
+def warm(excel_path, kinds=KINDS, sheet_name=0):
+    """
+    Make sure the cache entries of excel_path exist, without returning
+    (or, on a hit, even reading) the frames. The workbook is parsed at
+    most once for all kinds. Returns None.
+    """
+    for kind in kinds:
+        if not cache_path(excel_path, kind, sheet_name=sheet_name).exists():
+            load_block(excel_path, kind, sheet_name=sheet_name)
+
+
+def clear_cache():
+    """Remove every cached frame."""
+    if CACHE_DIR.exists():
+        for p in CACHE_DIR.iterdir():
+            p.unlink()
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def load_energyplan_file(path):
@@ -44,3 +45,82 @@ def build_params(case: str, base_params, base_case_params, shock_case_params):
         raise ValueError(f"Unknown case: {case}")
 
     return params
+
+
+class ScenarioTemplate:
+    """
+    Reference EnergyPLAN scenario file, parsed once.
+
+    The lines are kept as an immutable tuple and the file is encoded to
+    bytes once. A variant is written as slices of those bytes with only
+    the overridden value lines swapped in, so the unchanged parts are
+    shared between all variants instead of copied per variant.
+
+    Usage:
+        tpl = ScenarioTemplate(ref_path)
+        tpl.write(out_path, params)
+        tpl.write_variants([(path_1, params_1), (path_2, params_2), ...])
+    """
+
+    BOM = b"\xff\xfe"   # files are written as UTF-16 (little endian), like the notebook
+
+    def __init__(self, path, encoding="utf-16"):
+        self.path = Path(path)
+
+        # newline="" keeps the original line endings
+        with open(path, encoding=encoding, newline="") as f:
+            self.lines = tuple(f.readlines())
+
+        self.value_idx = {}
+        for i in range(0, len(self.lines) - 1, 2):
+            self.value_idx[self.lines[i].strip().rstrip("=")] = i + 1
+
+        encoded = [line.encode("utf-16-le") for line in self.lines]
+        self._data = memoryview(self.BOM + b"".join(encoded))
+        self._offsets = [len(self.BOM)]
+        for b in encoded:
+            self._offsets.append(self._offsets[-1] + len(b))
+
+    def __repr__(self):
+        return f"ScenarioTemplate({str(self.path)!r}, {len(self.value_idx)} parameters)"
+
+    def _value_line(self, idx, value):
+        """Formatted value with the line ending of the line it replaces."""
+        old = self.lines[idx]
+        ending = old[len(old.rstrip("\r\n")):]
+        return (format_value(value).rstrip("\n") + ending).encode("utf-16-le")
+
+    def chunks(self, params):
+        """Byte chunks of one variant: template slices + replaced value lines."""
+        try:
+            idxs = sorted((self.value_idx[name], value) for name, value in params.items())
+        except KeyError as e:
+            raise KeyError(f"Parameter name not found in file: {e.args[0]!r}") from None
+
+        out, start = [], 0      # start 0 keeps the BOM in the first slice
+        for idx, value in idxs:
+            out.append(self._data[start:self._offsets[idx]])
+            out.append(self._value_line(idx, value))
+            start = self._offsets[idx + 1]
+        out.append(self._data[start:])
+        return out
+
+    def render(self, params):
+        """Variant as text (for inspection)."""
+        return b"".join(self.chunks(params))[len(self.BOM):].decode("utf-16-le")
+
+    def write(self, out_path, params):
+        """Write one variant."""
+        with open(out_path, "wb") as f:
+            f.writelines(self.chunks(params))
+        return out_path
+
+    def write_variants(self, variants, workers=8):
+        """
+        Write many variants through a thread pool.
+
+        variants : iterable of (out_path, params) pairs
+        Returns the list of written paths, in input order.
+        """
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda v: self.write(*v), variants))
@@ -0,0 +1,147 @@
+import csv
+import hashlib
+import itertools
+import json
+from pathlib import Path
+import numpy as np
+
+from pyfiles.scenario_functions import build_params
+
+# -------------------------------------------------------------------------------
+# 1. designs: lazy generators of {parameter name: value} dicts
+# -------------------------------------------------------------------------------
+
+def _plain(v):
+    """numpy scalars -> python scalars (stable json / csv output)."""
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def full_factorial(levels):
+    """
+    Every combination of the given levels.
+
+    levels : {name: sequence of values}, e.g.
+             {'input_nuclear_cap': [0, 1000, 2000, 3000],
+              'input_RES1_capacity': [4000, 5150, 6000]}
+    """
+    names = list(levels)
+    for combo in itertools.product(*(levels[n] for n in names)):
+        yield {n: _plain(v) for n, v in zip(names, combo)}
+
+
+def latin_hypercube(ranges, n, seed=0, integer=False):
+    """
+    Latin-hypercube sample of n points.
+
+    ranges  : {name: (low, high)}
+    integer : round values to int (e.g. capacities in MW)
+
+    Only one permutation per parameter is held in memory; points are
+    produced one at a time.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(ranges)
+    perms = [rng.permutation(n) for _ in names]
+    for i in range(n):
+        point = {}
+        for name, perm in zip(names, perms):
+            lo, hi = ranges[name]
+            u = (perm[i] + rng.random()) / n
+            v = lo + u * (hi - lo)
+            point[name] = int(round(v)) if integer else float(v)
+        yield point
+
+
+def one_at_a_time(levels, baseline=None):
+    """
+    Vary one parameter at a time around a baseline.
+
+    levels   : {name: sequence of values}
+    baseline : {name: value} (default: first level of each parameter)
+
+    The baseline point itself comes first.
+    """
+    if baseline is None:
+        baseline = {n: vals[0] for n, vals in levels.items()}
+    baseline = {n: _plain(v) for n, v in baseline.items()}
+
+    yield dict(baseline)
+    for name, vals in levels.items():
+        for v in vals:
+            if _plain(v) != baseline[name]:
+                yield {**baseline, name: _plain(v)}
+
+
+# -------------------------------------------------------------------------------
+# 2. run ids and parameter dicts
+# -------------------------------------------------------------------------------
+
+def run_id(params):
+    """
+    Stable id of a run from its full scenario params (case params with the
+    design point applied): same scenario -> same id across runs and designs,
+    while one point swept under two cases gets two ids.
+    """
+    key = json.dumps(params, sort_keys=True, default=str)
+    return "run_" + hashlib.sha1(key.encode()).hexdigest()[:10]
+
+
+def iter_params(points, case, base_params, base_case_params, shock_case_params):
+    """
+    Lazily yield (run_id, point, params): the build_params dict of `case`
+    with the design point applied on top.
+    """
+    case_params = build_params(case, base_params, base_case_params, shock_case_params)
+    for point in points:
+        params = {**case_params, **point}
+        yield run_id(params), point, params
+
+
+# -------------------------------------------------------------------------------
+# 3. streaming scenario files + manifest
+# -------------------------------------------------------------------------------
+
+def write_sweep(runs, template, out_dir, manifest="manifest.csv", batch_size=256, workers=8):
+    """
+    Write one scenario file per run and a manifest, streaming.
+
+    runs     : iterable of (run_id, point, params), e.g. from iter_params
+    template : scenario_functions.ScenarioTemplate of the reference file
+    manifest : csv in out_dir with run_id, scenario and the point values
+
+    Runs are consumed in batches of batch_size, so large designs never
+    sit in memory at once. Returns the manifest path.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = out_dir / manifest
+
+    runs = iter(runs)
+    with open(manifest, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        while True:
+            batch = list(itertools.islice(runs, batch_size))
+            if not batch:
+                break
+
+            if writer is None:
+                names = list(batch[0][1])
+                writer = csv.writer(f)
+                writer.writerow(["run_id", "scenario"] + names)
+
+            template.write_variants(
+                [(out_dir / f"{rid}.txt", params) for rid, _, params in batch],
+                workers=workers,
+            )
+            writer.writerows(
+                [rid, f"{rid}.txt"] + [point.get(n) for n in names]
+                for rid, point, _ in batch
+            )
+
+    return manifest
+
+
+def read_manifest(path):
+    """Manifest rows as dicts (lazy)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
@@ -105,6 +105,16 @@ GWnuc_caps = {
     'Storage_Heat':         156,
 }
 
+# Capacity registry: scenario stem -> installed capacities
+caps_by_source = {
+    'test_new_VP':                  test_new_VP_caps,
+    'test_new_VP_shock':            test_new_VP_shock_caps,
+    'RES':                          RES_caps,
+    'IDA2045_Final':                IDA2045_Final_caps,
+    'IDA2045_nuclear_flexible_dh':  IDA2045_nuclear_flexible_dh,
+    '1GWnuc':                       GWnuc_caps,
+}
+
 #################################################################################################
 # GROUPS
 #################################################################################################
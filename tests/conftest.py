@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the pyfiles modules are imported as `pyfiles.<module>` from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,86 @@
+import json
+
+import openpyxl
+import pytest
+
+from pyfiles.catalogue import Catalogue
+from pyfiles.ep_run import ANNUAL_ROW, ASCII_SUFFIX, HEADER_ROW, HOURLY_START
+
+
+def _ascii_export(path, wind, total_costs, n_hours=48):
+    """Minimal EnergyPLAN -ascii output: cost rows, two header rows, annual row, hourly block."""
+    lines = [""] * (HEADER_ROW + 1)
+    # raw frame index i is sheet row i + 2, i.e. line i + 1
+    lines[60] = "Variable costs\t10"
+    lines[61] = f"TOTAL ANNUAL COSTS\t{total_costs}"
+    lines += ["\tWind\tPV", "\tElectr.\tElectr."]
+    block = [""] * (HOURLY_START + n_hours)
+    block[ANNUAL_ROW] = f"TWh/year\t{wind}\t1.5"
+    for h in range(n_hours):
+        block[HOURLY_START + h] = f"{h + 1}\t{wind}\t0"
+    lines += block
+    path.write_text("\n".join(lines) + "\n", encoding="latin-1")
+
+
+def _workbook(path, wind, total_costs):
+    """The same layout as _ascii_export as an .xlsx (line n is sheet row n)."""
+    text = path.with_suffix(".tmp")
+    _ascii_export(text, wind, total_costs)
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for r, line in enumerate(text.read_text(encoding="latin-1").splitlines(), start=1):
+        for c, v in enumerate(line.split("\t"), start=1):
+            if v:
+                ws.cell(r, c, float(v) if v.replace(".", "").isdigit() else v)
+    wb.save(path)
+    text.unlink()
+
+
+def _scenario(path, **params):
+    text = "".join(f"{k}=\n{v}\n" for k, v in params.items())
+    path.write_text(text, encoding="utf-16")
+
+
+@pytest.fixture
+def batch_dir(tmp_path):
+    """0_EP_runs-like folder holding two ep_batch runs, a failed one and their runs.jsonl."""
+    run_dir = tmp_path / "runs"
+    run_dir.mkdir()
+    log = []
+    for rid, wind in (("run_a", 10.0), ("run_b", 20.0)):
+        _scenario(tmp_path / f"{rid}.txt", input_RES1_capacity=wind * 100, input_nuclear_cap=0)
+        _ascii_export(run_dir / f"{rid}{ASCII_SUFFIX}", wind, total_costs=wind * 2)
+        log.append({"run_id": rid, "scenario": str(tmp_path / f"{rid}.txt"), "output": f"{rid}{ASCII_SUFFIX}",
+                    "params": {"input_RES1_capacity": wind * 100}, "status": "ok"})
+    log.append({"run_id": "run_c", "scenario": "missing.txt", "output": f"run_c{ASCII_SUFFIX}",
+                "params": {}, "status": "failed"})
+    (run_dir / "runs.jsonl").write_text("\n".join(map(json.dumps, log)) + "\n", encoding="utf-8")
+    return run_dir
+
+
+def test_scan_indexes_batch_outputs(tmp_path, batch_dir):
+    with Catalogue(path=tmp_path / "cat.sqlite", run_dir=batch_dir) as cat:
+        assert cat.scan() == ["run_a", "run_b"]
+        assert cat.scan() == []
+
+        assert cat.runs()["file"].tolist() == [f"run_a{ASCII_SUFFIX}", f"run_b{ASCII_SUFFIX}"]
+        assert cat.find(("input_RES1_capacity", ">=", 1500)) == [f"run_b{ASCII_SUFFIX}"]
+        assert cat.annual(["Wind_Electr."]).loc["run_b", "Wind_Electr."] == 20.0
+        assert cat.costs().loc["run_a", "TOTAL ANNUAL COSTS"] == 20.0
+
+        origins = dict(cat.con.execute(
+            "SELECT origin, COUNT(*) FROM params WHERE source = 'run_a' GROUP BY origin"
+        ).fetchall())
+        assert origins == {"scenario": 1, "sweep": 1}
+
+
+def test_scan_reads_workbooks_from_its_run_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run_dir = tmp_path / "other"
+    run_dir.mkdir()
+    _workbook(run_dir / "A.xlsx", 30.0, total_costs=7.0)
+
+    with Catalogue(path=tmp_path / "cat.sqlite", run_dir="other") as cat:
+        assert cat.scan() == ["A"]
+        assert cat.annual(["Wind_Electr."]).loc["A", "Wind_Electr."] == 30.0
+        assert cat.costs().loc["A", "TOTAL ANNUAL COSTS"] == 7.0
@@ -0,0 +1,53 @@
+import pandas as pd
+
+from pyfiles.chunk_store import ChunkStore
+
+
+class FakeClient:
+    """Stands in for eds_client.EDSClient: one row per hour and price area."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_frame(self, dataset, refresh=False, start=None, end=None, columns=None, **kwargs):
+        self.calls.append({'start': start, 'refresh': refresh, 'filter': kwargs.get('filter')})
+        hours = pd.date_range(start, periods=3, freq="h")
+        df = pd.DataFrame({'HourUTC': hours.strftime("%Y-%m-%dT%H:%M:%S"), 'PriceArea': 'DK1'})
+        for c in columns[2:]:
+            df[c] = 1.0
+        return df
+
+
+def test_current_year_with_dict_filter(tmp_path):
+    client = FakeClient()
+    store = ChunkStore(root=tmp_path, client=client)
+    year = pd.Timestamp.now(tz="UTC").year
+    flt = {"PriceArea": ["DK1"]}
+
+    df = store.get("Elspotprices", ["SpotPriceDKK"], f"{year}-01-01", f"{year}-01-02", filter=flt)
+    assert list(df.columns) == ["HourUTC", "PriceArea", "SpotPriceDKK"]
+    assert len(df) == 3
+    assert client.calls == [{'start': f"{year}-01-01T00:00", 'refresh': True, 'filter': flt}]
+
+    # refreshed once per store, also when the same filter comes as a JSON string
+    store.get("Elspotprices", ["SpotPriceDKK"], f"{year}-01-01", f"{year}-01-02", filter=flt)
+    store.get("Elspotprices", ["SpotPriceDKK"], f"{year}-01-01", f"{year}-01-02",
+              filter='{"PriceArea":["DK1"]}')
+    assert len(client.calls) == 1
+
+
+def test_running_year_fetched_again_after_it_ends(tmp_path, monkeypatch):
+    client = FakeClient()
+    year = pd.Timestamp.now(tz="UTC").year
+    args = ("Elspotprices", ["SpotPriceDKK"], f"{year}-01-01", f"{year + 1}-01-01")
+
+    ChunkStore(root=tmp_path, client=client).get(*args)
+    assert len(client.calls) == 1
+
+    # a year later the chunk of the then running year is completed once, then left alone
+    now = pd.Timestamp.now(tz="UTC") + pd.DateOffset(years=1)
+    monkeypatch.setattr(pd.Timestamp, "now", classmethod(lambda cls, tz=None: now))
+    ChunkStore(root=tmp_path, client=client).get(*args)
+    assert client.calls[1] == {'start': f"{year}-01-01T00:00", 'refresh': True, 'filter': None}
+    ChunkStore(root=tmp_path, client=client).get(*args)
+    assert len(client.calls) == 2
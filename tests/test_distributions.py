@@ -0,0 +1,31 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyfiles.distributions import format_distribution, write_distribution
+
+
+def _to_csv(series):
+    """The writer the notebooks used before distributions.py."""
+    buf = io.StringIO()
+    series.to_csv(buf, sep="\t", index=False, header=False, lineterminator="\n")
+    return buf.getvalue().encode("utf-8")
+
+
+@pytest.mark.parametrize("series", [
+    pd.Series([0.1, 2.0, np.nan, 1e-7, 12345.678]),
+    pd.Series([1, 2, 3]),
+    pd.Series(np.array([0, 7, 8784], dtype=np.int32)),
+    pd.Series(np.array([1.5, 2.0], dtype=np.float32)),
+])
+def test_format_matches_to_csv(series):
+    assert format_distribution(series, newline="\n") == _to_csv(series)
+
+
+def test_write_skips_unchanged(tmp_path):
+    path = tmp_path / "2024_test.txt"
+    assert write_distribution(pd.Series([1, 2, 3]), path, newline="\n")
+    assert path.read_bytes() == b"1\n2\n3\n"
+    assert not write_distribution(pd.Series([1, 2, 3]), path, newline="\n")
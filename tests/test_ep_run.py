@@ -0,0 +1,30 @@
+from pyfiles.ep_run import ASCII_SUFFIX, HEADER_ROW, HOURLY_START, RUN_DIR, is_text_export, text_sibling
+
+
+def _ascii_export(path, value="1.5", n_hours=4):
+    """Header rows and a short hourly block at the positions of the Excel sheet."""
+    lines = [""] * (HEADER_ROW + 1) + ["\tWind\tPV", "\tElectr.\tElectr."] + [""] * HOURLY_START
+    lines += [f"{h + 1}\t{value}\t0" for h in range(n_hours)]
+    path.write_text("\n".join(lines) + "\n", encoding="latin-1")
+
+
+def test_text_sibling_keeps_dotted_stems(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / RUN_DIR).mkdir()
+    _ascii_export(tmp_path / RUN_DIR / f"B{ASCII_SUFFIX}")
+
+    assert text_sibling("B.v2.xlsx") is None
+    _ascii_export(tmp_path / RUN_DIR / f"B.v2{ASCII_SUFFIX}")
+    assert text_sibling("B.v2.xlsx") == RUN_DIR / f"B.v2{ASCII_SUFFIX}"
+    assert text_sibling("B.xlsx") == RUN_DIR / f"B{ASCII_SUFFIX}"
+
+
+def test_is_text_export_checks_the_decimal(tmp_path):
+    path = tmp_path / f"A{ASCII_SUFFIX}"
+    _ascii_export(path, value="1,5")
+    assert not is_text_export(path)
+    assert is_text_export(path, decimal=",")
+
+    _ascii_export(path, value="1.5")
+    assert is_text_export(path)
+    assert not is_text_export(path, decimal=",")
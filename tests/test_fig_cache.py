@@ -0,0 +1,21 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from pyfiles import fig_cache
+
+
+def _save(path, key):
+    path.write_text(key)
+    fig_cache.record(path, key)
+
+
+def test_parallel_records_keep_every_entry(tmp_path):
+    paths = [tmp_path / f"fig{i}.pdf" for i in range(32)]
+    keys = [f"key{i}" for i in range(32)]
+    with ProcessPoolExecutor(4) as ex:
+        list(ex.map(_save, paths, keys))
+
+    assert all(fig_cache.is_current(p, k) for p, k in zip(paths, keys))
+    assert not fig_cache.is_current(paths[0], keys[1])
+
+    paths[0].write_text("edited")
+    assert not fig_cache.is_current(paths[0], keys[0])
@@ -0,0 +1,90 @@
+import ast
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+import pyfiles.var_groups as var_groups
+from pyfiles.figures import FIGURES
+
+ROOT = Path(__file__).resolve().parents[1]
+NOTEBOOKS = ['3_time_series_output.ipynb', '4_descriptive_analysis.ipynb']
+
+# notebook arguments that pick data or output, not what the figure shows
+IGNORED = {'dfs', 'savepath', 'dpi', 'cache', 'show', 'plot_two'}
+
+BARS = ('capture_rates', 'capacity_factors')
+
+
+def _code_cells(notebook):
+    with open(ROOT / notebook, encoding='utf-8') as f:
+        cells = json.load(f)['cells']
+    return [''.join(c['source']) for c in cells if c['cell_type'] == 'code']
+
+
+def _namespace(cells):
+    """Globals of the notebook's setup cell (imports, colors, source_labels)."""
+    src = '\n'.join(line for line in cells[0].splitlines() if not line.lstrip().startswith('%'))
+    ns = {}
+    exec(src, ns)
+    return ns
+
+
+def _saved_figures():
+    """{file stem: (evaluated keyword args, cell source, earlier cells)} of every notebook call with a savepath."""
+    out = {}
+    for notebook in NOTEBOOKS:
+        cells = _code_cells(notebook)
+        ns = _namespace(cells)
+        for i, src in enumerate(cells):
+            try:
+                tree = ast.parse(src)
+            except SyntaxError:     # cells with IPython magics
+                continue
+            for node in ast.walk(tree):
+                if not isinstance(node, ast.Call):
+                    continue
+                kw = {k.arg: k.value for k in node.keywords}
+                if 'savepath' not in kw:
+                    continue
+                args = {
+                    k: eval(compile(ast.Expression(v), notebook, 'eval'), ns)
+                    for k, v in kw.items() if k not in IGNORED
+                }
+                out[Path(ast.literal_eval(kw['savepath'])).stem] = (args, src, cells[:i])
+    return out
+
+
+SAVED = _saved_figures()
+
+
+def _last(pattern, cells):
+    found = [m for c in cells for m in re.findall(pattern, c)]
+    assert found, pattern
+    return found[-1]
+
+
+def test_every_saved_figure_has_a_spec():
+    assert sorted(SAVED) == sorted(s['name'] for s in FIGURES)
+
+
+@pytest.mark.parametrize('spec', FIGURES, ids=lambda s: s['name'])
+def test_spec_matches_notebook(spec):
+    args, src, before = SAVED[spec['name']]
+    opts = dict(spec['options'])
+
+    if spec['kind'] in BARS:
+        # the notebook renames the columns before the call; _bars does it from tech_labels
+        assert opts.pop('tech_labels') == getattr(var_groups, _last(r'rename\(columns=var_groups\.(\w+)\)', [src]))
+    assert opts == args
+
+    # runs: the workbooks the notebook reads last before the figure
+    assert spec['runs'] == _last(r'for f in var_groups\.(\w+)', before)
+
+    if spec['kind'] == 'capture_rates':
+        assert spec['techs'] == getattr(var_groups, _last(r'keep_cols = var_groups\.(\w+)', before))
+    if spec['kind'] == 'capacity_factors':
+        assert spec['variables'] == getattr(var_groups, _last(r'keep_cols = var_groups\.(\w+)', before))
+        scale = _last(r'cap_energy_full = caps_df \* 8784(?:\s*\*\s*(\d+))?', before)
+        assert spec.get('scale', 1.0) == float(scale or 1)
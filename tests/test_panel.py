@@ -0,0 +1,15 @@
+import numpy as np
+import pandas as pd
+
+from pyfiles.panel import ScenarioPanel
+
+
+def test_from_frames_aligns_on_hour():
+    a = pd.DataFrame({"hour": [1, 2, 3, 4], "source": "A", "x": [1.0, 2.0, 3.0, 4.0]})
+    # gap at hour 2 and reversed order
+    b = pd.DataFrame({"hour": [4, 3, 1], "source": "B", "x": [40.0, 30.0, 10.0], "y": [4.0, 3.0, 1.0]})
+
+    panel = ScenarioPanel.from_frames([b, a])
+    assert panel.hour.tolist() == [1, 2, 3, 4]
+    np.testing.assert_array_equal(panel.var("x"), [[10, np.nan, 30, 40], [1, 2, 3, 4]])
+    np.testing.assert_array_equal(panel.var("y"), [[1, np.nan, 3, 4], [np.nan] * 4])